@@ -5,18 +5,236 @@
 # attempted moves, and they will either return False or return True and will be counted as a valid move. The players
 # take turns until one of the Kings is captured.
 
+import random
+from array import array
+from collections import OrderedDict
+
+
+# precomputed square tables. squares are numbered 0 to 63, starting at a1 and moving across each rank up to h8, so
+# the file (column) of a square is index % 8 and the rank (row) is index // 8. Building the names once means the board
+# never has to glue strings together like key + str(row_number) while checking a move.
+FILE_LETTERS = "abcdefgh"
+SQUARE_NAMES = [letter + str(rank) for rank in range(1, 9) for letter in FILE_LETTERS]
+SQUARE_INDEX = {name: index for index, name in enumerate(SQUARE_NAMES)}
+SQUARE_FILE = [index % 8 for index in range(64)]
+SQUARE_RANK = [index // 8 for index in range(64)]
+COLUMN_GUIDE = {"a": 1, "b": 2, "c": 3, "d": 4, "e": 5, "f": 6, "g": 7, "h": 8}
+
+# piece codes stored in the board array. the low three bits hold the piece type and BLACK is added for black pieces,
+# so code & 7 is the type and code & BLACK tells the color. EMPTY marks an open square.
+EMPTY = 0
+PAWN = 1
+KNIGHT = 2
+BISHOP = 3
+ROOK = 4
+QUEEN = 5
+KING = 6
+BLACK = 8
+PIECE_CODES = {"P": PAWN, "N": KNIGHT, "B": BISHOP, "R": ROOK, "Q": QUEEN, "K": KING,
+               "p": BLACK | PAWN, "n": BLACK | KNIGHT, "b": BLACK | BISHOP, "r": BLACK | ROOK, "q": BLACK | QUEEN,
+               "k": BLACK | KING}
+PIECE_LETTERS = [" "] * 16  # display letter for every piece code, " " for EMPTY
+for letter, code in PIECE_CODES.items():
+    PIECE_LETTERS[code] = letter
+
+# bitboards. a bitboard is a 64-bit int where bit n is set when square n (see SQUARE_NAMES) is part of the set.
+FULL_BOARD = (1 << 64) - 1
+SQUARE_BITS = [1 << index for index in range(64)]
+KNIGHT_STEPS = ((2, 1), (1, 2), (-1, 2), (-2, 1), (-2, -1), (-1, -2), (1, -2), (2, -1))
+KING_STEPS = ((1, 0), (1, 1), (0, 1), (-1, 1), (-1, 0), (-1, -1), (0, -1), (1, -1))
+# sliding directions as (rank step, file step). the first two of each group move toward higher square indexes
+ROOK_DIRECTIONS = ((1, 0), (0, 1), (-1, 0), (0, -1))
+BISHOP_DIRECTIONS = ((1, 1), (1, -1), (-1, -1), (-1, 1))
+
+
+def step_targets(index, steps):
+    """takes a square index and a tuple of (rank step, file step) pairs, and returns the bitboard of squares reached
+    by taking each step once. Steps that would leave the board are dropped"""
+    targets = 0
+    for rank_step, file_step in steps:
+        rank = SQUARE_RANK[index] + rank_step
+        file = SQUARE_FILE[index] + file_step
+        if 0 <= rank < 8 and 0 <= file < 8:
+            targets |= SQUARE_BITS[rank * 8 + file]
+    return targets
+
+
+def ray(index, rank_step, file_step):
+    """takes a square index and a direction, and returns the bitboard of every square from index (not included) to
+    the edge of the board in that direction, ignoring any pieces in the way"""
+    squares = 0
+    rank = SQUARE_RANK[index] + rank_step
+    file = SQUARE_FILE[index] + file_step
+    while 0 <= rank < 8 and 0 <= file < 8:
+        squares |= SQUARE_BITS[rank * 8 + file]
+        rank += rank_step
+        file += file_step
+    return squares
+
+
+# zobrist keys. every (piece code, square) pair, every square holding an unmoved pawn, and black being the side to
+# move gets a fixed random 64-bit number, and a position's key is all the numbers that apply XORed together. A fixed
+# seed keeps keys the same between runs so they can be stored.
+_zobrist_random = random.Random(20241208)
+ZOBRIST_PIECES = [[_zobrist_random.getrandbits(64) for index in range(64)] for code in range(16)]
+ZOBRIST_UNMOVED_PAWN = [_zobrist_random.getrandbits(64) for index in range(64)]
+ZOBRIST_BLACK_TO_MOVE = _zobrist_random.getrandbits(64)
+
+KNIGHT_ATTACKS = [step_targets(index, KNIGHT_STEPS) for index in range(64)]
+KING_ATTACKS = [step_targets(index, KING_STEPS) for index in range(64)]
+# squares a pawn can capture on, indexed by color (0 for white, 1 for black) and then square
+PAWN_ATTACKS = ([step_targets(index, ((1, -1), (1, 1))) for index in range(64)],
+                [step_targets(index, ((-1, -1), (-1, 1))) for index in range(64)])
+# (rays from every square, True if the direction moves toward higher square indexes) for each sliding direction
+ROOK_RAYS = [([ray(index, *direction) for index in range(64)], direction[0] * 8 + direction[1] > 0)
+             for direction in ROOK_DIRECTIONS]
+BISHOP_RAYS = [([ray(index, *direction) for index in range(64)], direction[0] * 8 + direction[1] > 0)
+               for direction in BISHOP_DIRECTIONS]
+QUEEN_RAYS = ROOK_RAYS + BISHOP_RAYS
+# every square a rook, bishop or queen on each square could reach on an empty board
+ROOK_LINES = [sum(ray_table[index] for ray_table, toward_higher in ROOK_RAYS) for index in range(64)]
+BISHOP_LINES = [sum(ray_table[index] for ray_table, toward_higher in BISHOP_RAYS) for index in range(64)]
+QUEEN_LINES = [ROOK_LINES[index] | BISHOP_LINES[index] for index in range(64)]
+
+
+def between(starting_index, ending_index):
+    """takes two square indexes and returns the bitboard of the squares strictly between them if they are on the
+    same row, column or diagonal, or 0 if they are not (or are next to each other)"""
+    for direction in ROOK_DIRECTIONS + BISHOP_DIRECTIONS:
+        squares = ray(starting_index, *direction)
+        if squares & SQUARE_BITS[ending_index]:
+            return squares ^ ray(ending_index, *direction) ^ SQUARE_BITS[ending_index]
+    return 0
+
+
+# squares strictly between every pair of squares, indexed by starting square and then ending square
+BETWEEN = [[between(starting_index, ending_index) for ending_index in range(64)] for starting_index in range(64)]
+
+
+def sliding_attacks(index, occupied, rays):
+    """takes a square index, the bitboard of occupied squares, and ROOK_RAYS, BISHOP_RAYS or QUEEN_RAYS. returns the
+    bitboard of squares a sliding piece on index can reach, stopping at (and including) the first piece in each
+    direction"""
+    attacks = 0
+    for ray_table, toward_higher in rays:
+        squares = ray_table[index]
+        blockers = squares & occupied
+        if blockers:
+            if toward_higher:
+                first_blocker = (blockers & -blockers).bit_length() - 1
+            else:
+                first_blocker = blockers.bit_length() - 1
+            squares ^= ray_table[first_blocker]
+        attacks |= squares
+    return attacks
+
 
 class ChessVar:
     """the ChessVar class represents the actual game of Chess, the Fog of War variation. The ChessVar game will have
     two players, a board, a game state, and a current turn. Turn defaults to the white player. No parameters are needed
     to create a ChessVar object"""
 
+    __slots__ = ("_players", "_board", "_game_state", "_moves", "_turn", "_undo_stack", "_view_cache",
+                 "_shared_view_cache", "_instrumentation")
+
     def __init__(self):
         self._players = {"white": Player('white'), "black": Player('black')}
         self._board = Board()
         self._game_state = 'UNFINISHED'
         self._moves = 0
         self._turn = "white"
+        # one (start, end, captured code, captured moves made, unmoved pawn bits, game state, turn) per move
+        self._undo_stack = []
+        self._view_cache = None  # ViewCache of this position's views, see enable_view_cache
+        self._shared_view_cache = None
+        self._instrumentation = None  # Instrumentation collecting timings for this game, see enable_instrumentation
+
+    def set_layout(self, piece_codes, unmoved_pawns, turn="white", moves=0):
+        """takes a list of 64 piece codes (indexed like SQUARE_NAMES, EMPTY for open squares), a bitboard of the pawns
+        that have not made their first move, whose turn it is, and how many moves have been made, and sets the game
+        up in that position. The game state is worked out from which kings are still on the board, and there are no
+        moves to take back afterwards"""
+        self._board.set_layout(piece_codes, unmoved_pawns)
+        self._turn = turn
+        self._moves = moves
+        self._undo_stack = []
+        if self._view_cache is not None:
+            self._view_cache.clear()
+        if not self._board.get_bitboard(KING):
+            self._game_state = 'BLACK_WON'
+        elif not self._board.get_bitboard(BLACK | KING):
+            self._game_state = 'WHITE_WON'
+        else:
+            self._game_state = 'UNFINISHED'
+
+    def to_fen(self):
+        """returns the current position as a FEN-style string with four fields separated by spaces: the pieces on
+        each row from 8 down to 1 (letters as in get_board, digits for runs of open squares, rows separated by
+        "/"), whose turn it is ("w" or "b"), the squares of the pawns that have not made their first move run
+        together (like "a2b2h7"), or "-" if there are none, and the number of moves made so far. There is no
+        castling or en passant in this variant, so unlike chess FEN those fields are left out. The starting
+        position is "rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w a2b2c2d2e2f2g2h2a7b7c7d7e7f7g7h7 0" in this
+        format"""
+        squares = self._board.get_squares()
+        rows = []
+        for rank in range(7, -1, -1):
+            row = ""
+            open_squares = 0
+            for index in range(rank * 8, rank * 8 + 8):
+                if squares[index] == EMPTY:
+                    open_squares += 1
+                else:
+                    if open_squares:
+                        row += str(open_squares)
+                        open_squares = 0
+                    row += PIECE_LETTERS[squares[index]]
+            if open_squares:
+                row += str(open_squares)
+            rows.append(row)
+        unmoved_pawns = self._board.get_unmoved_pawns()
+        unmoved = "".join(SQUARE_NAMES[index] for index in range(64) if unmoved_pawns & SQUARE_BITS[index])
+        return f"{'/'.join(rows)} {'w' if self._turn == 'white' else 'b'} {unmoved or '-'} {self._moves}"
+
+    @classmethod
+    def from_fen(cls, fen):
+        """takes a string in the format made by to_fen and returns a new ChessVar game in that position. The move
+        count field can be left off. The game state comes from which kings are on the board. Raises ValueError if
+        the string cannot be read"""
+        fields = fen.split()
+        if len(fields) not in (3, 4):
+            raise ValueError(f"expected 3 or 4 fields in {fen!r}")
+        rows = fields[0].split("/")
+        if len(rows) != 8:
+            raise ValueError(f"expected 8 rows in {fields[0]!r}")
+        piece_codes = [EMPTY] * 64
+        for row_number, row in enumerate(rows):
+            index = (7 - row_number) * 8
+            row_end = index + 8
+            for symbol in row:
+                if symbol in "12345678":
+                    index += int(symbol)
+                elif symbol in PIECE_CODES and index < row_end:
+                    piece_codes[index] = PIECE_CODES[symbol]
+                    index += 1
+                else:
+                    raise ValueError(f"bad row {row!r} in {fields[0]!r}")
+            if index != row_end:
+                raise ValueError(f"row {row!r} does not have 8 squares")
+        if fields[1] not in ("w", "b"):
+            raise ValueError(f"turn must be 'w' or 'b', not {fields[1]!r}")
+        unmoved_pawns = 0
+        if fields[2] != "-":
+            for start in range(0, len(fields[2]), 2):
+                index = SQUARE_INDEX.get(fields[2][start:start + 2])
+                if index is None or piece_codes[index] & 7 != PAWN:
+                    raise ValueError(f"{fields[2][start:start + 2]!r} is not a square with a pawn on it")
+                unmoved_pawns |= SQUARE_BITS[index]
+        if len(fields) == 4 and not fields[3].isdigit():
+            raise ValueError(f"move count must be a number, not {fields[3]!r}")
+        game = cls()
+        game.set_layout(piece_codes, unmoved_pawns, "white" if fields[1] == "w" else "black",
+                        int(fields[3]) if len(fields) == 4 else 0)
+        return game
 
     def get_game_state(self):
         """returns the current game_state from the ChessVar class object. valid options
@@ -38,11 +256,80 @@ class ChessVar:
         or ‘black.’"""
         self._turn = next_player
 
+    def fork(self):
+        """returns a new ChessVar in the same position as this one (same board, turn, game state and moves that can
+        be taken back) that can be played on without changing this game, and the other way around. Much cheaper
+        than copy.deepcopy: the board's arrays are shared between the two games until one of them moves, and the
+        undo records are immutable tuples so only the list holding them is copied. Useful for trying out
+        what-if lines or sampling possible positions. A fork made while the view cache is on gets its own cache,
+        sharing the same shared_cache"""
+        game = ChessVar.__new__(ChessVar)
+        game._players = self._players
+        game._board = Board.__new__(Board)
+        game._board.copy_from(self._board, share=True)
+        game._game_state = self._game_state
+        game._moves = self._moves
+        game._turn = self._turn
+        game._undo_stack = list(self._undo_stack)
+        game._view_cache = None
+        game._shared_view_cache = None
+        game._instrumentation = None
+        if self._view_cache is not None:
+            game.enable_view_cache(self._shared_view_cache)
+        if self._instrumentation is not None:
+            game.enable_instrumentation(self._instrumentation)
+        return game
+
+    def get_player(self, color):
+        """takes 'white' or 'black' and returns that player's Player object"""
+        return self._players[color]
+
+    def get_board_object(self):
+        """returns the Board object the game is played on, for code (like move generators and engines) that works
+        with the board's arrays and bitboards directly"""
+        return self._board
+
     def get_board(self, viewpoint):
         """takes a viewpoint as a parameter and provides the current game board. valid viewpoints are 'white', 'black'
         and 'audience', which would provide the view from the white player's viewpoint, the black player's viewpoint,
-        and the audience's viewpoint, respectively. Calls out to a Board object and method"""
-        return self._board.get_board_view(viewpoint)
+        and the audience's viewpoint, respectively. Calls out to a Board object and method. Once enable_view_cache
+        has been called, views are reused until the next move"""
+        if self._view_cache is None:
+            return self._board.get_board_view(viewpoint)
+        view = self._view_cache.get(viewpoint)
+        if view is None:
+            shared_key = (self._board.get_zobrist_key(), viewpoint)
+            if self._shared_view_cache is not None:
+                view = self._shared_view_cache.get(shared_key)
+            if view is None:
+                view = tuple(tuple(row) for row in self._board.get_board_view(viewpoint))
+                if self._shared_view_cache is not None:
+                    self._shared_view_cache.put(shared_key, view)
+            self._view_cache.put(viewpoint, view)
+        return [list(row) for row in view]
+
+    def get_board_delta(self, viewpoint):
+        """takes a viewpoint ('white', 'black' or 'audience') and returns the squares of that view that have changed
+        since the last call for the same viewpoint, as a list of (square name, new symbol) tuples like
+        ("e4", "P"). The first call returns the whole board. Applying every delta in order to a copy of the board
+        keeps it the same as get_board(viewpoint)"""
+        return self._board.get_view_delta(viewpoint)
+
+    def enable_view_cache(self, shared_cache=None):
+        """turns on caching for get_board. The views of the current position are kept until the next move (or pop),
+        so asking for the same viewpoint again does not rebuild the board. Optionally takes a ViewCache to share
+        between games, keyed on the board's zobrist key and the viewpoint, so common positions like the opening are
+        only worked out once. Returns this game's own ViewCache so its hit and miss counts can be checked"""
+        self._view_cache = ViewCache(3)
+        self._shared_view_cache = shared_cache
+        return self._view_cache
+
+    def enable_instrumentation(self, instrumentation):
+        """takes an Instrumentation (see instrumentation.py) and from now on records counters and timings for this
+        game's make_move, get_board views and board_display_assist calls in it. Passing None turns it back off.
+        Games without instrumentation only pay for checking that it is None"""
+        self._instrumentation = instrumentation
+        self._board.set_instrumentation(instrumentation)
 
     def make_move(self, starting_pos, ending_pos):
         """takes the starting position and the ending position as parameters. the method attempts to make the move as
@@ -53,224 +340,738 @@ class ChessVar:
         data member, will update the number of moves of that Piece object,  will change the turn to the other player
         (by calling set_turn), will iterate the turns forward by 1, will verify if we need to update the game_state,
         and will update any Player class object pieces_captured list if necessary"""
-        # if the game is won, return false
-        if self._game_state == 'WHITE_WON' or self._game_state == "BLACK_WON":
-            return False
-
-        # establish variables
-        valid_positions = ["a8", "a7", "a6", "a5", "a4", "a3", "a2", "a1",
-                           "b8", "b7", "b6", "b5", "b4", "b3", "b2", "b1",
-                           "c8", "c7", "c6", "c5", "c4", "c3", "c2", "c1",
-                           "d8", "d7", "d6", "d5", "d4", "d3", "d2", "d1",
-                           "e8", "e7", "e6", "e5", "e4", "e3", "e2", "e1",
-                           "f8", "f7", "f6", "f5", "f4", "f3", "f2", "f1",
-                           "g8", "g7", "g6", "g5", "g4", "g3", "g2", "g1",
-                           "h8", "h7", "h6", "h5", "h4", "h3", "h2", "h1", ]
-
-        # if not starting with a valid spot on the board
-        if starting_pos not in valid_positions:
-            return False
-
-        # if not ending with a valid spot on the board
-        if ending_pos not in valid_positions:
+        if self._instrumentation is not None:
+            return self._instrumentation.make_move(self, starting_pos, ending_pos)
+        move = self.check_move(starting_pos, ending_pos)
+        if move is None:
             return False
+        self.push(move)
+        return True  # valid move returns True
+
+    def check_move(self, starting_pos, ending_pos):
+        """takes the starting position and the ending position in algebraic notation and runs every check make_move
+        runs, without making the move. Returns the move as a (starting index, ending index) tuple if make_move would
+        accept it, or None if it would not"""
+        # if not starting or ending with a valid spot on the board
+        starting_index = SQUARE_INDEX.get(starting_pos)
+        ending_index = SQUARE_INDEX.get(ending_pos)
+        if starting_index is None or ending_index is None:
+            return None
+        return self.check_index_move(starting_index, ending_index)
+
+    def check_index_move(self, starting_index, ending_index):
+        """same as check_move, but takes square indexes (0 to 63) instead of square names"""
+        # if the game is won, return None
+        if self._game_state == 'WHITE_WON' or self._game_state == "BLACK_WON":
+            return None
 
         # if starting and ending at the same spot
-        if starting_pos == ending_pos:
-            return False
+        if starting_index == ending_index:
+            return None
 
-        starting_pos_row = starting_pos[1:]
-        ending_pos_row = ending_pos[1:]
-        starting_pos_piece = self._board.get_current_board()[starting_pos_row][starting_pos]
-        ending_pos_piece = self._board.get_current_board()[ending_pos_row][ending_pos]
+        starting_pos_piece = self._board.get_piece_at(starting_index)
+        ending_pos_piece = self._board.get_piece_at(ending_index)
 
-        # if starting position is empty, return false
-        if starting_pos_piece == " ":
-            return False
+        # if starting position is empty, return None
+        if starting_pos_piece is None:
+            return None
 
-        # if piece at starting position is the opposite color, return False
-        starting_pos_piece_color = starting_pos_piece.get_player_color()
-        if starting_pos_piece_color != self._turn:
-            return False
+        # if piece at starting position is the opposite color, return None
+        if starting_pos_piece.get_player_color() != self._turn:
+            return None
 
-        # if piece at ending pos is the same clor as the player taking a turn, return False.
-        if ending_pos_piece != " ":  # make sure the spot isn't empty before asking for color
-            ending_pos_piece_color = ending_pos_piece.get_player_color()
-            if ending_pos_piece_color == self._turn:
-                return False
+        # if piece at ending pos is the same color as the player taking a turn, return None.
+        if ending_pos_piece is not None and ending_pos_piece.get_player_color() == self._turn:
+            return None
 
         # checks if move is valid based on type of Piece subclass.
-        if not starting_pos_piece.is_valid_move(starting_pos, ending_pos, self._board):
+        if not starting_pos_piece.is_valid_index_move(starting_index, ending_index, self._board):
+            return None
+
+        return starting_index, ending_index
+
+    def apply_moves(self, moves, trusted=False):
+        """takes a sequence of moves and plays them in order, stopping at the first one make_move would not accept.
+        Each move can be a string like "e2e4", a (starting position, ending position) tuple like ("e2", "e4"), a
+        (starting index, ending index) tuple, or a 12-bit packed move (starting index * 64 + ending index, as in
+        get_packed_move_log). Returns the index in moves of the first move that was not played, or -1 if every move
+        was. With trusted=True the moves are assumed to have been checked already (for example when they were
+        recorded) and are not checked again: they are played all at once with the Board's move_pieces, which only
+        touches the square arrays until the end. Only moves that do not name two squares, and moves after one that
+        captures a king, are turned away"""
+        if self._instrumentation is not None and not trusted:
+            for move_number, move in enumerate(moves):
+                indexes = move_indexes(move)
+                if indexes is None or not self.make_move(SQUARE_NAMES[indexes[0]], SQUARE_NAMES[indexes[1]]):
+                    return move_number
+            return -1
+        if trusted:
+            index_moves = []
+            first_bad = -1
+            for move_number, move in enumerate(moves):
+                indexes = move_indexes(move)
+                if indexes is None:
+                    first_bad = move_number
+                    break
+                index_moves.append(indexes)
+            if not index_moves:
+                return first_bad
+            if self._game_state != 'UNFINISHED':
+                return 0
+            if self._view_cache is not None:
+                self._view_cache.clear()
+            turn = self._turn
+            other = "black" if turn == "white" else "white"
+            undo_data = self._board.move_pieces(index_moves)
+            for (starting_index, ending_index), (captured_code, captured_moves_made, unmoved_pawns) in \
+                    zip(index_moves, undo_data):
+                self._undo_stack.append((starting_index, ending_index, captured_code, captured_moves_made,
+                                         unmoved_pawns, 'UNFINISHED', turn))
+                turn, other = other, turn
+            if undo_data[-1][0] & 7 == KING:  # capturing a King wins the game for the other player
+                self._game_state = "WHITE_WON" if undo_data[-1][0] & BLACK else "BLACK_WON"
+            self._turn = turn
+            self._moves += len(undo_data)
+            if len(undo_data) < len(index_moves):
+                return len(undo_data)
+            return first_bad
+        for move_number, move in enumerate(moves):
+            indexes = move_indexes(move)
+            if indexes is None:
+                return move_number
+            indexes = self.check_index_move(indexes[0], indexes[1])
+            if indexes is None:
+                return move_number
+            self.push(indexes)
+        return -1
+
+    def push(self, move):
+        """takes a move as a (starting index, ending index) tuple of square indexes, like the ones returned by the
+        Board's generate_moves, and plays it without checking that it is valid. Used by make_move once a move has
+        passed its checks, and by search code that already knows the move is legal. Records what is needed to take
+        the move back with pop, so positions can be explored in place instead of copying the whole game"""
+        starting_index, ending_index = move
+        captured_code = self._board.get_squares()[ending_index]
+        unmoved_pawns = self._board.get_unmoved_pawns() & (SQUARE_BITS[starting_index] | SQUARE_BITS[ending_index])
+        self._undo_stack.append((starting_index, ending_index, captured_code,
+                                 self._board.get_moves_made(ending_index), unmoved_pawns, self._game_state,
+                                 self._turn))
+        if self._view_cache is not None:
+            self._view_cache.clear()
+
+        if captured_code & 7 == KING:  # capturing a King wins the game for the other player
+            self._game_state = "WHITE_WON" if captured_code & BLACK else "BLACK_WON"
+        self._board.move_piece(starting_index, ending_index)  # update layout of board and the piece's moves made
+
+        # update the turn
+        if self._turn == "white":
+            self._turn = "black"
+        elif self._turn == "black":
+            self._turn = "white"
+        # increase the number of moves of the whole game
+        self._moves += 1
+
+    def pop(self):
+        """takes back the last move played by make_move or push, putting back any captured piece, the moving
+        piece's moves made, the game state and the turn. Returns the move as a (starting index, ending index) tuple,
+        or None if there is nothing to take back"""
+        if not self._undo_stack:
+            return None
+        (starting_index, ending_index, captured_code, captured_moves_made, unmoved_pawns, game_state,
+         turn) = self._undo_stack.pop()
+        if self._view_cache is not None:
+            self._view_cache.clear()
+        self._board.unmove_piece(starting_index, ending_index, captured_code, captured_moves_made, unmoved_pawns)
+        self._game_state = game_state
+        self._turn = turn
+        self._moves -= 1
+        return starting_index, ending_index
+
+    def undo_move(self):
+        """takes back the last move, the same as pop, and returns it as a (starting position, ending position) tuple
+        in algebraic notation. Returns False if no moves have been made"""
+        move = self.pop()
+        if move is None:
             return False
-
-        else:
-            if ending_pos_piece != " ":  # if ending pos has a piece that is being captured, run is captured method
-                ending_pos_piece.set_is_captured(True, self)  # King capture handles a "win" scenario
-            starting_pos_piece.update_moves_made()  # update piece's moves made
-            starting_pos_piece.set_position(ending_pos)  # update piece's position on the board
-            self._board.update_board_from_move(starting_pos, ending_pos)  # update layout of board
-
-            # update the turn
-            if self._turn == "white":
-                self._turn = "black"
-            elif self._turn == "black":
-                self._turn = "white"
-            # increase the number of moves of the whole game
-            self._moves += 1
-            return True  # valid move returns True
+        return SQUARE_NAMES[move[0]], SQUARE_NAMES[move[1]]
+
+    def position_key(self):
+        """returns a 64-bit zobrist key for the current position: the pieces on the board, which pawns can still
+        move two squares, and whose turn it is. Two positions with the same key can be treated as the same position,
+        which makes the key useful for caches and for finding repeated positions across games"""
+        if self._turn == "black":
+            return self._board.get_zobrist_key() ^ ZOBRIST_BLACK_TO_MOVE
+        return self._board.get_zobrist_key()
+
+    def get_move_log(self):
+        """returns every move made so far (and not taken back) as a list of (starting position, ending position)
+        tuples in algebraic notation, oldest first. The log is read off the undo stack, so it always matches the
+        board"""
+        return [(SQUARE_NAMES[record[0]], SQUARE_NAMES[record[1]]) for record in self._undo_stack]
+
+    def get_packed_move_log(self):
+        """returns the same moves as get_move_log, but with every move packed into one 12-bit number: the starting
+        square index times 64 plus the ending square index"""
+        return [record[0] << 6 | record[1] for record in self._undo_stack]
+
+    def generate_moves(self, color):
+        """takes 'white' or 'black' and returns a list of (starting position, ending position) tuples in algebraic
+        notation, like ("e2", "e4"), for every move make_move would accept from that player if it were their turn.
+        Returns an empty list once the game is won"""
+        if self._game_state != 'UNFINISHED':
+            return []
+        return [(SQUARE_NAMES[starting_index], SQUARE_NAMES[ending_index])
+                for starting_index, ending_index in self._board.generate_moves(color)]
+
+
+def move_indexes(move):
+    """takes a move in any of the forms ChessVar's apply_moves accepts and returns it as a (starting index, ending
+    index) tuple, or None if it does not name two squares"""
+    if isinstance(move, int):
+        if 0 <= move < 4096:
+            return move >> 6, move & 63
+        return None
+    if isinstance(move, str):
+        if len(move) != 4:
+            return None
+        starting_index = SQUARE_INDEX.get(move[:2])
+        ending_index = SQUARE_INDEX.get(move[2:])
+    elif len(move) == 2 and isinstance(move[0], int) and isinstance(move[1], int):
+        starting_index, ending_index = move
+        if not (0 <= starting_index < 64 and 0 <= ending_index < 64):
+            return None
+    elif len(move) == 2:
+        starting_index = SQUARE_INDEX.get(move[0])
+        ending_index = SQUARE_INDEX.get(move[1])
+    else:
+        return None
+    if starting_index is None or ending_index is None:
+        return None
+    return starting_index, ending_index
+
+
+class ViewCache:
+    """The ViewCache class holds rendered board views, evicting the least recently used view once it holds max_size
+    of them. It counts hits and misses so the size can be tuned. Each game with caching turned on has a small one
+    keyed by viewpoint, and one larger ViewCache can be shared by many games, keyed by (zobrist key, viewpoint).
+    Views are stored as tuples of tuples so a caller can never change a cached view"""
+
+    __slots__ = ("_max_size", "_views", "_hits", "_misses")
+
+    def __init__(self, max_size=4096):
+        self._max_size = max_size
+        self._views = OrderedDict()
+        self._hits = 0
+        self._misses = 0
+
+    def get(self, key):
+        """takes a key and returns the cached view for it, or None if it is not cached. Counts a hit or a miss"""
+        view = self._views.get(key)
+        if view is None:
+            self._misses += 1
+            return None
+        self._views.move_to_end(key)
+        self._hits += 1
+        return view
+
+    def put(self, key, view):
+        """takes a key and a view and stores the view, evicting the least recently used view if the cache is full"""
+        self._views[key] = view
+        self._views.move_to_end(key)
+        if len(self._views) > self._max_size:
+            self._views.popitem(last=False)
+
+    def clear(self):
+        """removes every view from the cache. The hit and miss counts are kept"""
+        self._views.clear()
+
+    def get_hits(self):
+        """returns how many times get found a cached view"""
+        return self._hits
+
+    def get_misses(self):
+        """returns how many times get did not find a cached view"""
+        return self._misses
+
+    def get_max_size(self):
+        """returns the most views the cache will hold"""
+        return self._max_size
+
+    def __len__(self):
+        return len(self._views)
 
 
 class Player:
     """The Player class represents the players of the game. The two players will always be 'white' and 'black' to
-    match the color of the standard Chess pieces. Player objects will be created when a ChessVar object is created."""
+    match the color of the standard Chess pieces. Player objects will be created when a ChessVar object is created.
+    A Player does not keep its own copy of its pieces: the Board already keeps a bitboard of every player's pieces
+    up to date on every move and capture, so the piece methods here read from the board they are given. That also
+    lets games made with fork share their Player objects"""
+
+    __slots__ = ("_player_type",)
 
     def __init__(self, player_type):
         self._player_type = player_type
-        self._pieces = []
 
     def get_player_type(self):
         """returns the Player object’s player_type which should be ‘white’ or ‘black.’"""
         return self._player_type
 
+    def get_pieces(self, board_object):
+        """takes the board and returns this player's pieces still on it as a list of (square index, Piece) tuples,
+        touching only the squares the player's pieces are on"""
+        return [(index, board_object.get_piece_at(index))
+                for index in board_object.get_piece_squares(self._player_type)]
+
+    def get_king_square(self, board_object):
+        """takes the board and returns the square index of this player's king, or None if it has been captured"""
+        return board_object.get_king_square(self._player_type)
+
 
 class Board:
     """The Board class represents the physical board the game is played on. A board object will always be created when
     a ChessVar object is created, as ChessVar initialized a Board object in its default data members. A board object
-    will contain the layout/structure of the current board, and will also generate all the board_pieces by calling out
-    to the individual pieces classes (Rook, Knight, etc.) that are subclassed to the Pieces class. The Rook, Knight,
-    Queen, King, Bishop, and Pawn objects will be placed in their default starting position on the board."""
+    will contain the layout/structure of the current board: the piece code on every square, how many moves the piece
+    on every square has made, and bitboards of where each kind of piece is. All of that lives in flat arrays, and the
+    Piece objects themselves are shared by every board (see PIECES_BY_CODE). A new board starts in the default
+    starting position by sharing the arrays of STARTING_BOARD, which is built once when the module is loaded, and
+    only copies them when its first move is made."""
+
+    __slots__ = ("_squares", "_moves_made", "_bitboards", "_color_bitboards", "_occupied", "_unmoved_pawns",
+                 "_attacks", "_view_baselines", "_zobrist_key", "_shared", "_instrumentation")
 
     def __init__(self):
-        self._black_rook_1 = Rook("black", "r", "a8")
-        self._black_knight_1 = Knight("black", "n", "b8")
-        self._black_bishop_1 = Bishop("black", "b", "c8")
-        self._black_queen = Queen("black", "q", "d8")
-        self._black_king = King("black", "k", "e8")
-        self._black_bishop_2 = Bishop("black", "b", "f8")
-        self._black_knight_2 = Knight("black", "n", "g8")
-        self._black_rook_2 = Rook("black", "r", "h8")
-        self._black_pawn_1 = Pawn("black", "p", "a7")
-        self._black_pawn_2 = Pawn("black", "p", "b7")
-        self._black_pawn_3 = Pawn("black", "p", "c7")
-        self._black_pawn_4 = Pawn("black", "p", "d7")
-        self._black_pawn_5 = Pawn("black", "p", "e7")
-        self._black_pawn_6 = Pawn("black", "p", "f7")
-        self._black_pawn_7 = Pawn("black", "p", "g7")
-        self._black_pawn_8 = Pawn("black", "p", "h7")
-        self._white_pawn_1 = Pawn("white", "P", "a2")
-        self._white_pawn_2 = Pawn("white", "P", "b2")
-        self._white_pawn_3 = Pawn("white", "P", "c2")
-        self._white_pawn_4 = Pawn("white", "P", "d2")
-        self._white_pawn_5 = Pawn("white", "P", "e2")
-        self._white_pawn_6 = Pawn("white", "P", "f2")
-        self._white_pawn_7 = Pawn("white", "P", "g2")
-        self._white_pawn_8 = Pawn("white", "P", "h2")
-        self._white_rook_1 = Rook("white", "R", "a1")
-        self._white_knight_1 = Knight("white", "N", "b1")
-        self._white_bishop_1 = Bishop("white", "B", "c1")
-        self._white_queen = Queen("white", "Q", "d1")
-        self._white_king = King("white", "K", "e1")
-        self._white_bishop_2 = Bishop("white", "B", "f1")
-        self._white_knight_2 = Knight("white", "N", "g1")
-        self._white_rook_2 = Rook("white", "R", "h1")
-        self._current_board = {
-            "8": {"a8": self._black_rook_1, "b8": self._black_knight_1, "c8": self._black_bishop_1,
-                  "d8": self._black_queen,
-                  "e8": self._black_king, "f8": self._black_bishop_2, "g8": self._black_knight_2,
-                  "h8": self._black_rook_2},
-            "7": {"a7": self._black_pawn_1, "b7": self._black_pawn_2, "c7": self._black_pawn_3,
-                  "d7": self._black_pawn_4,
-                  "e7": self._black_pawn_5, "f7": self._black_pawn_6, "g7": self._black_pawn_7,
-                  "h7": self._black_pawn_8},
-            "6": {"a6": " ", "b6": " ", "c6": " ", "d6": " ", "e6": " ", "f6": " ", "g6": " ", "h6": " "},
-            "5": {"a5": " ", "b5": " ", "c5": " ", "d5": " ", "e5": " ", "f5": " ", "g5": " ", "h5": " "},
-            "4": {"a4": " ", "b4": " ", "c4": " ", "d4": " ", "e4": " ", "f4": " ", "g4": " ", "h4": " "},
-            "3": {"a3": " ", "b3": " ", "c3": " ", "d3": " ", "e3": " ", "f3": " ", "g3": " ", "h3": " "},
-            "2": {"a2": self._white_pawn_1, "b2": self._white_pawn_2, "c2": self._white_pawn_3,
-                  "d2": self._white_pawn_4,
-                  "e2": self._white_pawn_5, "f2": self._white_pawn_6, "g2": self._white_pawn_7,
-                  "h2": self._white_pawn_8},
-            "1": {"a1": self._white_rook_1, "b1": self._white_knight_1, "c1": self._white_bishop_1,
-                  "d1": self._white_queen,
-                  "e1": self._white_king, "f1": self._white_bishop_2, "g1": self._white_knight_2,
-                  "h1": self._white_rook_2}
-        }
-        self._column_guide = {"a": 1, "b": 2, "c": 3, "d": 4, "e": 5, "f": 6, "g": 7, "h": 8}
+        self.copy_from(STARTING_BOARD, share=True)
+
+    def copy_from(self, other, share=False):
+        """takes another Board and makes this board an independent copy of it, copying its arrays rather than
+        building the position up again. With share=True the arrays are not copied at all: both boards use the same
+        ones until either of them makes or takes back a move, which copies them first (copy on write)"""
+        if share:
+            self._squares = other._squares
+            self._moves_made = other._moves_made
+            self._bitboards = other._bitboards
+            self._color_bitboards = other._color_bitboards
+            self._shared = other._shared = True  # neither board may change the arrays in place now
+        else:
+            self._squares = bytearray(other._squares)  # piece code for every square, indexed like SQUARE_NAMES
+            self._moves_made = array("I", other._moves_made)  # moves made by the piece on every square
+            # bitboards kept in step with the arrays above: one per piece code, one per color (0 white, 1 black)
+            self._bitboards = list(other._bitboards)
+            self._color_bitboards = list(other._color_bitboards)
+            self._shared = False
+        # all occupied squares and the pawns that have not made their first move yet, as bitboards
+        self._occupied = other._occupied
+        self._unmoved_pawns = other._unmoved_pawns
+        self._attacks = list(other._attacks)  # squares each color attacks, worked out on first use after every move
+        # viewpoint -> [squares changed by moves since its last delta, its hidden squares at that delta]
+        self._view_baselines = None
+        self._zobrist_key = other._zobrist_key
+        self._instrumentation = None
+
+    def set_layout(self, piece_codes, unmoved_pawns, moves_made=None):
+        """takes a list of 64 piece codes (indexed like SQUARE_NAMES, EMPTY for open squares) and a bitboard of the
+        pawns that have not moved yet, and replaces everything on the board with that layout. Rebuilds the bitboards
+        and the zobrist key from scratch. Can also take the number of moves made by the piece on every square;
+        otherwise pawns that are not in unmoved_pawns count as having made one move and every other piece none"""
+        self._squares = bytearray(piece_codes)
+        self._shared = False
+        self._rebuild_bitboards(unmoved_pawns)
+        if moves_made is None:
+            moves_made = [int(self._squares[index] & 7 == PAWN and not self._unmoved_pawns & SQUARE_BITS[index])
+                          for index in range(64)]
+        self._moves_made = array("I", moves_made)
+        self._view_baselines = None
+
+    def _rebuild_bitboards(self, unmoved_pawns):
+        """works out the bitboards and the zobrist key from scratch from the square array and a bitboard of the
+        pawns that have not moved yet"""
+        self._bitboards = [0] * 16
+        self._color_bitboards = [0, 0]
+        for index in range(64):
+            if self._squares[index] != EMPTY:
+                self._bitboards[self._squares[index]] |= SQUARE_BITS[index]
+                self._color_bitboards[self._squares[index] >> 3] |= SQUARE_BITS[index]
+        self._occupied = self._color_bitboards[0] | self._color_bitboards[1]
+        self._unmoved_pawns = unmoved_pawns & (self._bitboards[PAWN] | self._bitboards[BLACK | PAWN])
+        self._attacks = [None, None]
+        self._zobrist_key = 0
+        for index in range(64):
+            if self._squares[index] != EMPTY:
+                self._zobrist_key ^= ZOBRIST_PIECES[self._squares[index]][index]
+            if self._unmoved_pawns & SQUARE_BITS[index]:
+                self._zobrist_key ^= ZOBRIST_UNMOVED_PAWN[index]
+
+    def _unshare(self):
+        """gives this board its own copy of the arrays it has been sharing with another board since copy_from was
+        called with share=True. Called before the arrays are changed in place"""
+        self._squares = bytearray(self._squares)
+        self._moves_made = array("I", self._moves_made)
+        self._bitboards = list(self._bitboards)
+        self._color_bitboards = list(self._color_bitboards)
+        self._shared = False
+
+    def set_instrumentation(self, instrumentation):
+        """takes an Instrumentation, or None to turn it off, that get_board_view and board_display_assist record
+        their timings in. Called by ChessVar's enable_instrumentation"""
+        self._instrumentation = instrumentation
+
+    def get_instrumentation(self):
+        """returns the board's Instrumentation, or None if it is turned off"""
+        return self._instrumentation
 
     def get_column_guide(self):
-        """returns the column_guide data member for a board object. used for determining column letter vs number"""
-        return self._column_guide
+        """returns the column guide (COLUMN_GUIDE) that maps column letters to numbers. used for determining column
+        letter vs number"""
+        return COLUMN_GUIDE
 
-    def get_current_board(self):
-        """returns the current_board data member for a board object. Will be a nested dictionary when returning"""
-        return self._current_board
+    def get_squares(self):
+        """returns the 64 piece codes that make up the board as a bytearray, indexed the same way as SQUARE_NAMES (a1
+        is 0, h8 is 63). Open squares hold EMPTY. This is what the Pieces subclasses read when checking a move"""
+        return self._squares
+
+    def get_piece_at(self, index):
+        """takes a square index (0 to 63) as the parameter and returns the Piece object for the piece on that square
+        (shared by every piece of the same kind and color), or None if the square is open"""
+        return PIECES_BY_CODE[self._squares[index]]
+
+    def get_moves_made(self, index):
+        """takes a square index and returns the number of moves the piece on that square has made, 0 if the square
+        is open"""
+        return self._moves_made[index]
 
-    def get_board_view(self, viewpoint, index=0):
+    def get_current_board(self):
+        """returns the layout of the board as a nested dictionary, keyed by row ("8" down to "1") and then by square
+        name, holding the Piece object on each square or " " for an open square. The board is stored as flat arrays,
+        so this builds a fresh dictionary every time it is called"""
+        current_board = {}
+        for rank in range(7, -1, -1):
+            row = {}
+            for index in range(rank * 8, rank * 8 + 8):
+                piece = PIECES_BY_CODE[self._squares[index]]
+                row[SQUARE_NAMES[index]] = piece if piece is not None else " "
+            current_board[str(rank + 1)] = row
+        return current_board
+
+    def get_board_view(self, viewpoint):
         """returns a user-friendly version of the game board, using letters for game pieces (capital letters for
         White, lowercase for black), and returns a nested list instead of a nested dictionary. The viewpoint parameter
         will determine if the returned board will be displayed from the audience perspective, where all pieces are
         visible, or from the white or black player’s perspective, where the black or the white pieces are obfuscated,
-        respectively"""
-        nested_list = [[], [], [], [], [], [], [], []]
-        if viewpoint == "audience":
-            for key in self._current_board:
-                for nested_key in self._current_board[key]:
-                    if self._current_board[key][nested_key] != " ":
-                        nested_list[index].append(self._current_board[key][nested_key].get_display_letter())
+        respectively. Which pieces a player can see comes from one lookup of get_attacked_squares, so the whole view
+        is a single pass over the board"""
+        if self._instrumentation is not None:
+            return self._instrumentation.board_view(self, viewpoint)
+        return self.render_view(viewpoint)
+
+    def render_view(self, viewpoint):
+        """does the work of get_board_view, without any instrumentation"""
+        hidden = self.get_hidden_squares(viewpoint)
+        squares = self._squares
+        nested_list = []
+        for rank in range(7, -1, -1):
+            row = []
+            for index in range(rank * 8, rank * 8 + 8):
+                if hidden & SQUARE_BITS[index]:
+                    row.append("*")
+                else:
+                    row.append(PIECE_LETTERS[squares[index]])
+            nested_list.append(row)
+        return nested_list
+
+    def get_attacked_squares(self, color):
+        """takes 'white' or 'black' and returns the bitboard of squares that player's pieces could move to if an
+        enemy piece were standing there. A player can see exactly the enemy pieces on these squares. The result is
+        worked out once per position and kept until the next move"""
+        color_index = color == "black"
+        attacks = self._attacks[color_index]
+        if attacks is None:
+            color_bit = BLACK if color_index else 0
+            bitboards = self._bitboards
+            occupied = self._occupied
+            attacks = 0
+            for piece_type, attack_table, rays in ((PAWN, PAWN_ATTACKS[color_index], None),
+                                                   (KNIGHT, KNIGHT_ATTACKS, None), (BISHOP, None, BISHOP_RAYS),
+                                                   (ROOK, None, ROOK_RAYS), (QUEEN, None, QUEEN_RAYS),
+                                                   (KING, KING_ATTACKS, None)):
+                pieces = bitboards[color_bit | piece_type]
+                while pieces:
+                    lowest = pieces & -pieces
+                    pieces ^= lowest
+                    if rays is None:
+                        attacks |= attack_table[lowest.bit_length() - 1]
                     else:
-                        nested_list[index].append(" ")
-                index += 1
-            return nested_list
+                        attacks |= sliding_attacks(lowest.bit_length() - 1, occupied, rays)
+            self._attacks[color_index] = attacks
+        return attacks
+
+    def get_piece_squares(self, color):
+        """takes 'white' or 'black' and returns the square indexes of that player's pieces, lowest first. Read off
+        the color's bitboard, so it costs one step per piece (at most 16) instead of a pass over all 64 squares"""
+        pieces = self._color_bitboards[color == "black"]
+        piece_squares = []
+        while pieces:
+            lowest = pieces & -pieces
+            pieces ^= lowest
+            piece_squares.append(lowest.bit_length() - 1)
+        return piece_squares
+
+    def get_king_square(self, color):
+        """takes 'white' or 'black' and returns the square index of that player's king, or None if it has been
+        captured"""
+        king = self._bitboards[KING | BLACK if color == "black" else KING]
+        return king.bit_length() - 1 if king else None
+
+    def can_capture_king(self, color):
+        """takes 'white' or 'black' and returns True if that player has a piece that can capture the other player's
+        king right now, which wins the game. One lookup of get_attacked_squares"""
+        enemy_king = self._bitboards[KING if color == "black" else KING | BLACK]
+        return bool(enemy_king & self.get_attacked_squares(color))
+
+    def has_attacked_squares(self, color):
+        """takes 'white' or 'black' and returns True if get_attacked_squares for that player has already been worked
+        out for the current position"""
+        return self._attacks[color == "black"] is not None
+
+    def get_hidden_squares(self, viewpoint):
+        """takes a viewpoint ('white', 'black' or 'audience') and returns the bitboard of squares that show up as
+        "*" from that viewpoint: enemy pieces the player's pieces cannot reach. Nothing is hidden from the audience,
+        and every piece is hidden from an unknown viewpoint"""
+        if viewpoint == "audience":
+            return 0
+        if viewpoint == "white":
+            return self._color_bitboards[1] & ~self.get_attacked_squares("white")
+        if viewpoint == "black":
+            return self._color_bitboards[0] & ~self.get_attacked_squares("black")
+        return self._occupied
+
+    def get_view_delta(self, viewpoint):
+        """takes a viewpoint ('white', 'black' or 'audience') and returns what has changed in that viewpoint's view
+        since the last time this was called for it, as a list of (square name, new symbol) tuples using the same
+        symbols as get_board_view. The first call for a viewpoint returns every square. Instead of comparing two
+        full boards, the changed squares are the ones moves have touched plus the ones whose fog has come or gone,
+        so a square can be listed with the symbol it already had (for example after a move and a pop)"""
+        hidden = self.get_hidden_squares(viewpoint)
+        baseline = self._view_baselines.get(viewpoint) if self._view_baselines is not None else None
+        if baseline is None:
+            changed = FULL_BOARD
         else:
-            for key in self._current_board:
-                for nested_key in self._current_board[key]:
-                    if self._current_board[key][nested_key] != " ":
-                        if self._current_board[key][nested_key].get_player_color() != viewpoint:
-                            nested_list[index].append(
-                                self._current_board[key][nested_key].board_display_assist(nested_key, self, viewpoint))
-                        elif self._current_board[key][nested_key].get_player_color() == viewpoint:
-                            nested_list[index].append(self._current_board[key][nested_key].get_display_letter())
-                    elif self._current_board[key][nested_key] == " ":
-                        nested_list[index].append(" ")
-                index += 1
-            return nested_list
+            changed = baseline[0] | (baseline[1] ^ hidden)
+        if self._view_baselines is None:
+            self._view_baselines = {}
+        self._view_baselines[viewpoint] = [0, hidden]
+        delta = []
+        while changed:
+            lowest = changed & -changed
+            changed ^= lowest
+            index = lowest.bit_length() - 1
+            delta.append((SQUARE_NAMES[index], "*" if hidden & lowest else PIECE_LETTERS[self._squares[index]]))
+        return delta
 
     def update_board_from_move(self, starting_pos, ending_pos):
-        """updates the nested dictionary version of the board, the one in the current_board data member. This will only
-        get called if the move is deemed valid from the ChessVar class method of make_move."""
-        starting_row = starting_pos[1:]
-        ending_row = ending_pos[1:]
-        temp_piece = self._current_board[starting_row][starting_pos]
-        self._current_board[starting_row][starting_pos] = " "
-        self._current_board[ending_row][ending_pos] = temp_piece
-        return
+        """updates the board arrays after a move, taking the starting and ending positions in algebraic notation
+        (like "e2" and "e4"). This will only get called if the move is deemed valid from the ChessVar class method
+        of make_move."""
+        self.move_piece(SQUARE_INDEX[starting_pos], SQUARE_INDEX[ending_pos])
+
+    def move_piece(self, starting_index, ending_index):
+        """same as update_board_from_move, but takes square indexes (0 to 63) instead of square names. Whatever was on
+        the ending square is captured and taken off the board. The moving piece's move count goes up by one"""
+        if self._shared:
+            self._unshare()
+        moving_code = self._squares[starting_index]
+        captured_code = self._squares[ending_index]
+        starting_bit = SQUARE_BITS[starting_index]
+        ending_bit = SQUARE_BITS[ending_index]
+        if captured_code != EMPTY:
+            self._bitboards[captured_code] ^= ending_bit
+            self._color_bitboards[captured_code >> 3] ^= ending_bit
+            self._zobrist_key ^= ZOBRIST_PIECES[captured_code][ending_index]
+        self._bitboards[moving_code] ^= starting_bit | ending_bit
+        self._color_bitboards[moving_code >> 3] ^= starting_bit | ending_bit
+        self._occupied = self._color_bitboards[0] | self._color_bitboards[1]
+        self._zobrist_key ^= ZOBRIST_PIECES[moving_code][starting_index] ^ ZOBRIST_PIECES[moving_code][ending_index]
+        if self._unmoved_pawns & (starting_bit | ending_bit):
+            self._toggle_unmoved_pawns(self._unmoved_pawns & (starting_bit | ending_bit))
+        self._attacks[0] = self._attacks[1] = None
+        if self._view_baselines:
+            for baseline in self._view_baselines.values():
+                baseline[0] |= starting_bit | ending_bit
+
+        self._squares[ending_index] = moving_code
+        self._squares[starting_index] = EMPTY
+        self._moves_made[ending_index] = self._moves_made[starting_index] + 1
+        self._moves_made[starting_index] = 0
+
+    def unmove_piece(self, starting_index, ending_index, captured_code, captured_moves_made, unmoved_pawns):
+        """reverses move_piece. takes the starting and ending indexes of the move being taken back, the piece code
+        that was captured by the move (EMPTY if none) and how many moves that piece had made, and which of the two
+        squares held an unmoved pawn before the move (as a bitboard). Only called by ChessVar's pop"""
+        if self._shared:
+            self._unshare()
+        moving_code = self._squares[ending_index]
+        starting_bit = SQUARE_BITS[starting_index]
+        ending_bit = SQUARE_BITS[ending_index]
+        self._bitboards[moving_code] ^= starting_bit | ending_bit
+        self._color_bitboards[moving_code >> 3] ^= starting_bit | ending_bit
+        self._zobrist_key ^= ZOBRIST_PIECES[moving_code][starting_index] ^ ZOBRIST_PIECES[moving_code][ending_index]
+        if captured_code != EMPTY:
+            self._bitboards[captured_code] |= ending_bit
+            self._color_bitboards[captured_code >> 3] |= ending_bit
+            self._zobrist_key ^= ZOBRIST_PIECES[captured_code][ending_index]
+        self._occupied = self._color_bitboards[0] | self._color_bitboards[1]
+        if unmoved_pawns:
+            self._toggle_unmoved_pawns(unmoved_pawns)
+        self._attacks[0] = self._attacks[1] = None
+        if self._view_baselines:
+            for baseline in self._view_baselines.values():
+                baseline[0] |= starting_bit | ending_bit
+
+        self._squares[starting_index] = moving_code
+        self._squares[ending_index] = captured_code
+        self._moves_made[starting_index] = self._moves_made[ending_index] - 1
+        self._moves_made[ending_index] = captured_moves_made
+
+    def move_pieces(self, moves):
+        """takes a list of (starting index, ending index) moves that are already known to be valid and plays them
+        all, the same as calling move_piece for each but faster for long lists: only the square arrays are changed
+        move by move, and the bitboards and zobrist key are worked out once at the end. Stops after a move that
+        captures a king. Returns a list with, for every move played, the (captured piece code, captured piece's
+        moves made, unmoved pawn bits) that unmove_piece needs to take it back"""
+        if self._shared:
+            self._unshare()
+        squares = self._squares
+        moves_made = self._moves_made
+        unmoved_pawns = self._unmoved_pawns
+        changed = 0
+        undo_data = []
+        for starting_index, ending_index in moves:
+            captured_code = squares[ending_index]
+            moved_bits = SQUARE_BITS[starting_index] | SQUARE_BITS[ending_index]
+            undo_data.append((captured_code, moves_made[ending_index], unmoved_pawns & moved_bits))
+            unmoved_pawns &= ~moved_bits
+            changed |= moved_bits
+            squares[ending_index] = squares[starting_index]
+            squares[starting_index] = EMPTY
+            moves_made[ending_index] = moves_made[starting_index] + 1
+            moves_made[starting_index] = 0
+            if captured_code & 7 == KING:
+                break
+        self._rebuild_bitboards(unmoved_pawns)
+        if self._view_baselines:
+            for baseline in self._view_baselines.values():
+                baseline[0] |= changed
+        return undo_data
+
+    def _toggle_unmoved_pawns(self, squares):
+        """takes a bitboard of squares and flips whether each of them holds an unmoved pawn, keeping the zobrist key
+        in step"""
+        self._unmoved_pawns ^= squares
+        while squares:
+            lowest = squares & -squares
+            squares ^= lowest
+            self._zobrist_key ^= ZOBRIST_UNMOVED_PAWN[lowest.bit_length() - 1]
+
+    def get_zobrist_key(self):
+        """returns the 64-bit zobrist key of the pieces on the board, including which pawns have not moved yet. The
+        key is updated with every move rather than worked out from scratch. It does not include whose turn it is,
+        see ChessVar's position_key for that"""
+        return self._zobrist_key
+
+    def get_unmoved_pawns(self):
+        """returns the bitboard of squares holding a pawn (of either color) that has not made its first move"""
+        return self._unmoved_pawns
+
+    def get_bitboard(self, piece_code):
+        """takes a piece code (like ROOK or BLACK | ROOK) and returns the bitboard of squares holding that piece"""
+        return self._bitboards[piece_code]
+
+    def get_color_bitboard(self, color):
+        """takes 'white' or 'black' and returns the bitboard of squares holding that player's pieces"""
+        return self._color_bitboards[color == "black"]
+
+    def get_occupied(self):
+        """returns the bitboard of every square that has a piece on it"""
+        return self._occupied
+
+    def generate_moves(self, color):
+        """takes 'white' or 'black' and returns a list of (starting index, ending index) tuples for every move that
+        player's pieces can make. These are exactly the moves make_move would accept for that player: the Pieces
+        rules, no castling, en passant or promotion, and never onto a square holding one of the player's own pieces.
+        Squares are indexes into SQUARE_NAMES. Whose turn it is and whether the game is over are not checked here"""
+        color_index = color == "black"
+        color_bit = BLACK if color_index else 0
+        own = self._color_bitboards[color_index]
+        enemy = self._color_bitboards[not color_index]
+        occupied = self._occupied
+        targets = ~own & FULL_BOARD
+        bitboards = self._bitboards
+        moves = []
+
+        for piece_type, attack_table, rays in ((KNIGHT, KNIGHT_ATTACKS, None), (BISHOP, None, BISHOP_RAYS),
+                                               (ROOK, None, ROOK_RAYS), (QUEEN, None, QUEEN_RAYS),
+                                               (KING, KING_ATTACKS, None)):
+            pieces = bitboards[color_bit | piece_type]
+            while pieces:
+                lowest = pieces & -pieces
+                pieces ^= lowest
+                starting_index = lowest.bit_length() - 1
+                if rays is None:
+                    reachable = attack_table[starting_index] & targets
+                else:
+                    reachable = sliding_attacks(starting_index, occupied, rays) & targets
+                while reachable:
+                    lowest = reachable & -reachable
+                    reachable ^= lowest
+                    moves.append((starting_index, lowest.bit_length() - 1))
+
+        # pawns push forward onto open squares, two squares on their first move, and capture diagonally forward
+        pawns = bitboards[color_bit | PAWN]
+        empty = ~occupied & FULL_BOARD
+        if color_index:
+            single_pushes = (pawns >> 8) & empty
+            double_pushes = ((single_pushes & (self._unmoved_pawns >> 8)) >> 8) & empty
+            forward = -8
+        else:
+            single_pushes = (pawns << 8) & empty
+            double_pushes = ((single_pushes & (self._unmoved_pawns << 8)) << 8) & empty
+            forward = 8
+        while single_pushes:
+            lowest = single_pushes & -single_pushes
+            single_pushes ^= lowest
+            ending_index = lowest.bit_length() - 1
+            moves.append((ending_index - forward, ending_index))
+        while double_pushes:
+            lowest = double_pushes & -double_pushes
+            double_pushes ^= lowest
+            ending_index = lowest.bit_length() - 1
+            moves.append((ending_index - 2 * forward, ending_index))
+        pawn_attacks = PAWN_ATTACKS[color_index]
+        while pawns:
+            lowest = pawns & -pawns
+            pawns ^= lowest
+            starting_index = lowest.bit_length() - 1
+            captures = pawn_attacks[starting_index] & enemy
+            while captures:
+                lowest = captures & -captures
+                captures ^= lowest
+                moves.append((starting_index, lowest.bit_length() - 1))
+        return moves
 
 
 class Pieces:
     """The Pieces class is a Parent class for Rook, Pawn, Knight, Bishop, Queen, and King subclasses. The Pieces classes
      has methods and data members that will be share across the subclasses. To generate a Piece object (or one of its
-     subclasses), you need to pass the color of the piece, its display letter, and its current position on the board.
-     When initialized, will default to zero moves_made, and will set ‘is_captured’ to False in order to indicate it has
-     not been captured yet."""
+     subclasses), you need to pass the color of the piece and its display letter. A Piece object does not know where
+     it is or how many moves it has made, the Board keeps track of that by square, so there is only ever one Piece
+     object for each kind of piece (see PIECES_BY_CODE) and it is shared by every board and every game."""
+
+    __slots__ = ("_player_color", "_display_letter", "_piece_code")
 
-    def __init__(self, player_color, display_letter, position):
-        self._moves_made = 0
+    def __init__(self, player_color, display_letter):
         self._player_color = player_color
         self._display_letter = display_letter
-        self._position = position
-        self._is_captured = False
-
-    def update_moves_made(self):
-        """this method iterates forward the number of moves a piece has made. It will get called by the ChessVar class
-        if the make_move method determines the player’s move is valid. The purpose is to track if a Pawn has made its
-        first move yet, but could also be an interesting statistic for other pieces"""
-        self._moves_made += 1
-        return
-
-    def get_moves_made(self):
-        """returns the number of moves a Piece (or one of its subclasses) has made. Will be called to determine if a
-        Pawn has made its first move yet"""
-        return self._moves_made
+        self._piece_code = PIECE_CODES[display_letter]
 
     def get_player_color(self):
         """returns the player_color of the Piece (or its subclasses) object. It will be called by the Board class
@@ -282,374 +1083,149 @@ class Pieces:
         method get_board_view to make a user-friendly version of the board from various perspectives"""
         return self._display_letter
 
-    def get_position(self):
-        """will return the current position of the Piece object or one of the Piece subclass objects"""
-        return self._position
-
-    def set_position(self, new_position):
-        """will only get called by the ChessVar class by the make_move method if the move is considered valid. Will
-        set the Piece object (or an object of its subclasses) position to its new location on the board"""
-        self._position = new_position
-
-    def get_is_captured(self):
-        """will return the current value of the ‘is_captured’ data member of the Piece object or one of the Piece
-        subclass objects"""
-        return self._is_captured
-
-    def set_is_captured(self, new_value, game_object):
-        """will be called by the make_move method from the ChessVar class if the move is valid and the move causes
-        a Piece (or subclass) object to get captured. will mark a piece as captured. will also help determine if a
-        game has been won, as king being is_captured = True means the game has been one by one player. The King
-        subclass overrides this to add additional logic to handle the game winning aspect"""
-        self._is_captured = new_value
+    def get_piece_code(self):
+        """returns the piece code (see PIECE_CODES) that the Board stores in its array for this piece"""
+        return self._piece_code
 
     def board_display_assist(self, original_cell_ref, board_object, viewpoint):
-        """function will allow for display view of 'white' or 'black' viewpoint. will run through all the pieces that
-        belong to the viewpoint player. Will see if there are any valid moves to the opposite player's pieces. if yes,
-        will display the color. if no, will display an asterisk"""
-        for row in board_object.get_current_board():
-            for nested_cell_ref in board_object.get_current_board()[row]:
-                if board_object.get_current_board()[row][nested_cell_ref] != " ":
-                    if board_object.get_current_board()[row][nested_cell_ref].get_player_color() == viewpoint:
-                        if board_object.get_current_board()[row][nested_cell_ref].is_valid_move(
-                                nested_cell_ref, original_cell_ref, board_object) is True:
-                            return self.get_display_letter()
+        """function will allow for display view of 'white' or 'black' viewpoint. takes the square this piece is on
+        and checks it against the squares the viewpoint player's pieces can reach (from the board's
+        get_attacked_squares). if this piece is reachable, will display the letter. if no, will display an asterisk"""
+        if board_object.get_instrumentation() is not None:
+            return board_object.get_instrumentation().display_assist(self, original_cell_ref, board_object, viewpoint)
+        return self.display_symbol(original_cell_ref, board_object, viewpoint)
+
+    def display_symbol(self, original_cell_ref, board_object, viewpoint):
+        """does the work of board_display_assist, without any instrumentation"""
+        if viewpoint in ("white", "black") and \
+                board_object.get_attacked_squares(viewpoint) & SQUARE_BITS[SQUARE_INDEX[original_cell_ref]]:
+            return self.get_display_letter()
         return "*"
 
+    def is_valid_move(self, starting_pos, ending_pos, board_object):
+        """takes the starting and ending positions in algebraic notation (like "a2" and "a4") and the board, and
+        returns True if this piece is allowed to make that move. Does not check what is standing on the ending
+        square, that is left to make_move. The actual rules live in each subclass's is_valid_index_move"""
+        return self.is_valid_index_move(SQUARE_INDEX[starting_pos], SQUARE_INDEX[ending_pos], board_object)
+
+    def path_is_clear(self, starting_index, ending_index, board_object):
+        """takes two square indexes on the same row, column or diagonal and the board. returns True if every square
+        strictly between them is open, with one lookup in BETWEEN and one check against the board's occupied
+        squares. used by the Rook, Bishop, and Queen to make sure they are not jumping over a piece"""
+        return not BETWEEN[starting_index][ending_index] & board_object.get_occupied()
+
 
 class Pawn(Pieces):
     """the Pawn class is a subclass of the Pieces class. It represents the Pawn pieces on the game board. It
-    inherits the player_color, display_letter, and position from the pieces class, and it’ll be required to generate
+    inherits the player_color and display_letter from the pieces class, and it’ll be required to generate
     a Pawn object. Will contain a method to detail valid moves for Pawn pieces"""
 
-    def __init__(self, player_color, display_letter, position):
-        super().__init__(player_color, display_letter, position)
+    __slots__ = ()
 
-    def is_valid_move(self, starting_pos, ending_pos, board_object):
+    def is_valid_index_move(self, starting_index, ending_index, board_object):
         """this method determines if a Pawn move is valid. Will allow moving two squares forward on the first move,
         one move forward on other moves, and capturing objects diagonally forward. Cannot jump over pieces. Cannot
         move forward if blocked by a piece from the other player that is not in position to be captured"""
-        starting_col_numeric = int(board_object.get_column_guide()[starting_pos[0:1]])
-        starting_row_numeric = int(starting_pos[1:])
-        ending_col_numeric = int(board_object.get_column_guide()[ending_pos[0:1]])
-        ending_row_numeric = int(ending_pos[1:])
-        ending_pos_value = board_object.get_current_board()[ending_pos[1:]][ending_pos]
-        row_change = ending_row_numeric - starting_row_numeric
-        column_change = ending_col_numeric - starting_col_numeric
-
-        if (self.get_moves_made() == 0 and self.get_player_color() == "white" and row_change == 2 and
-                column_change == 0 and ending_pos_value == " "):  # when white, and pawn has no moves yet, can move up 2
-            middle_cell = starting_pos[0:1] + str(starting_row_numeric + 1)
-            if board_object.get_current_board()[middle_cell[1:]][middle_cell] != " ":
-                return False
-            else:
-                return True
-        elif (self.get_moves_made() == 0 and self.get_player_color() == "black" and row_change == -2 and
-              column_change == 0 and ending_pos_value == " "):  # when black, no moves yet, can move down 2
-            middle_cell = starting_pos[0:1] + str(starting_row_numeric - 1)
-            if board_object.get_current_board()[middle_cell[1:]][middle_cell] != " ":
-                return False
-            else:
-                return True
-        elif self.get_player_color() == "white" and row_change == 1 and column_change == 0 and ending_pos_value == " ":
-            return True
-        elif self.get_player_color() == "black" and row_change == -1 and column_change == 0 and ending_pos_value == " ":
-            return True
-        elif self.get_player_color() == "white" and row_change == 1 and column_change in [-1, 1] and ending_pos_value != " ":
-            if ending_pos_value.get_player_color() == "black":
+        squares = board_object.get_squares()
+        ending_code = squares[ending_index]
+        row_change = SQUARE_RANK[ending_index] - SQUARE_RANK[starting_index]
+        column_change = SQUARE_FILE[ending_index] - SQUARE_FILE[starting_index]
+        forward = 1 if self._piece_code < BLACK else -1  # white moves up the board, black moves down
+
+        if column_change == 0 and ending_code == EMPTY:
+            if row_change == forward:
                 return True
-            else:
-                return False
-        elif (self.get_player_color() == "black" and row_change == -1 and column_change in
-              [-1, 1] and ending_pos_value != " "):
-            if ending_pos_value.get_player_color() == "white":
-                return True
-            else:
-                return False
-        else:
+            if row_change == 2 * forward and board_object.get_unmoved_pawns() & SQUARE_BITS[starting_index]:
+                # no moves yet, can move 2
+                return squares[starting_index + 8 * forward] == EMPTY  # cannot jump the middle cell
             return False
+        if row_change == forward and column_change in (-1, 1) and ending_code != EMPTY:  # capture diagonally
+            return (ending_code & BLACK) != (self._piece_code & BLACK)
+        return False
 
 
 class Rook(Pieces):
     """ the Rook class is a subclass of the Pieces class. It represents the Rook pieces on the game board.
-    It inherits the player_color, display_letter, and position from the pieces class, and it’ll be required to generate
+    It inherits the player_color and display_letter from the pieces class, and it’ll be required to generate
      a Rook object. Will contain a method to detail valid moves for Rook pieces"""
 
-    def __init__(self, player_color, display_letter, position):
-        super().__init__(player_color, display_letter, position)
+    __slots__ = ()
 
-    def is_valid_move(self, starting_pos, ending_pos, board_object):
+    def is_valid_index_move(self, starting_index, ending_index, board_object):
         """This method determines if a Rook object move is valid. Will allow moving forward, backwards, or side to
         side in straight lines. Cannot jump over pieces."""
-        starting_col_numeric = int(board_object.get_column_guide()[starting_pos[0:1]])
-        starting_row_numeric = int(starting_pos[1:])
-        ending_col_numeric = int(board_object.get_column_guide()[ending_pos[0:1]])
-        ending_row_numeric = int(ending_pos[1:])
-        row_change = ending_row_numeric - starting_row_numeric
-        column_change = ending_col_numeric - starting_col_numeric
-
-        if abs(row_change) > 0 and column_change == 0:  # move up or down board. row change.
-            if ending_row_numeric > starting_row_numeric:  # moving up
-                for row_number in range(starting_row_numeric + 1, ending_row_numeric):
-                    if board_object.get_current_board()[str(row_number)][ending_pos[0:1] + str(row_number)] != " ":
-                        return False
-                return True
-            if starting_row_numeric > ending_row_numeric:  # moving down
-                for row_number in range(ending_row_numeric + 1, starting_row_numeric):
-                    if board_object.get_current_board()[str(row_number)][starting_pos[0:1] + str(row_number)] != " ":
-                        return False
-                return True
-        if abs(column_change) > 0 and row_change == 0:  # move left or right. column change.
-            if ending_col_numeric > starting_col_numeric:  # moving right
-                for col_number in range(starting_col_numeric + 1, ending_col_numeric):
-                    for key in board_object.get_column_guide():
-                        if board_object.get_column_guide()[key] == col_number:
-                            if board_object.get_current_board()[str(starting_row_numeric)][
-                                key + str(starting_row_numeric)] != " ":
-                                return False
-                return True
-            if starting_col_numeric > ending_col_numeric:  # moving left
-                for col_number in range(ending_col_numeric + 1, starting_col_numeric):
-                    for key in board_object.get_column_guide():
-                        if board_object.get_column_guide()[key] == col_number:
-                            if board_object.get_current_board()[str(starting_row_numeric)][key + str(starting_row_numeric)] != " ":
-                                return False
-                return True
-        else:
+        if not ROOK_LINES[starting_index] & SQUARE_BITS[ending_index]:  # not on the same row or column
             return False
+        return self.path_is_clear(starting_index, ending_index, board_object)
 
 
 class Knight(Pieces):
     """the Knight class is a subclass of the Pieces class. It represents the Knight pieces on the game board.
-    It inherits the player_color, display_letter, and position from the pieces class, and it’ll be required to
+    It inherits the player_color and display_letter from the pieces class, and it’ll be required to
     generate a Knight object. Will contain a method to detail valid moves for Knight pieces"""
 
-    def __init__(self, player_color, display_letter, position):
-        super().__init__(player_color, display_letter, position)
+    __slots__ = ()
 
-    def is_valid_move(self, starting_pos, ending_pos, board_object):
+    def is_valid_index_move(self, starting_index, ending_index, board_object):
         """determines if a Knight object move is valid. Will allow moving two squares vertically and one square
         horizontally, or two squares horizontally and one square vertically. Can ‘jump over’ other pieces."""
-        starting_col_numeric = int(board_object.get_column_guide()[starting_pos[0:1]])
-        starting_row_numeric = int(starting_pos[1:])
-        ending_col_numeric = int(board_object.get_column_guide()[ending_pos[0:1]])
-        ending_row_numeric = int(ending_pos[1:])
-        row_change = ending_row_numeric - starting_row_numeric
-        column_change = ending_col_numeric - starting_col_numeric
-
-        if abs(row_change) == 2 and abs(column_change) == 1:
-            return True
-        if abs(column_change) == 2 and abs(row_change) == 1:
-            return True
-        else:
-            return False
+        return bool(KNIGHT_ATTACKS[starting_index] & SQUARE_BITS[ending_index])
 
 
 class Bishop(Pieces):
     """ the Bishop class is a subclass of the Pieces class. It represents the Bishop pieces on the game board. It
-    inherits the player_color, display_letter, and position from the pieces class, and it’ll be required to generate
+    inherits the player_color and display_letter from the pieces class, and it’ll be required to generate
     a Bishop object. Will contain a method to detail valid moves for Bishop pieces"""
 
-    def __init__(self, player_color, display_letter, position):
-        super().__init__(player_color, display_letter, position)
+    __slots__ = ()
 
-    def is_valid_move(self, starting_pos, ending_pos, board_object):
+    def is_valid_index_move(self, starting_index, ending_index, board_object):
         """determines if a Bishop object move is valid. Can move diagonally in any direction (forward and backward)
         but cannot jump over another piece"""
-        starting_col_numeric = int(board_object.get_column_guide()[starting_pos[0:1]])
-        starting_row_numeric = int(starting_pos[1:])
-        ending_col_numeric = int(board_object.get_column_guide()[ending_pos[0:1]])
-        ending_row_numeric = int(ending_pos[1:])
-        row_change = ending_row_numeric - starting_row_numeric
-        column_change = ending_col_numeric - starting_col_numeric
-
-        if abs(row_change) == abs(column_change):  # if row change = col change, move is diagonal
-            if row_change in [-1, 1]:
-                return True
-            if row_change > 1 and column_change > 1:
-                # moving up and to the right. if moving 1, final position already checked in make_move logic
-                running_row = starting_row_numeric + 1
-                running_col = starting_col_numeric + 1
-                for key in board_object.get_column_guide():  # for all the keys in the dict column_guide
-                    if board_object.get_column_guide()[key] == running_col and running_row < ending_row_numeric:
-                        if board_object.get_current_board()[str(running_row)][key + str(running_row)] != " ":
-                            return False
-                        running_col += 1
-                        running_row += 1
-                return True
-
-            if row_change < -1 and column_change < -1:
-                # moving down and to the left. if moving 1, final position already checked in make_move logic
-                running_row = ending_row_numeric + 1
-                running_col = ending_col_numeric + 1
-                for key in board_object.get_column_guide():  # for all the keys in the dict column_guide
-                    if board_object.get_column_guide()[key] == running_col and running_row < starting_row_numeric:
-                        if board_object.get_current_board()[str(running_row)][key + str(running_row)] != " ":
-                            return False
-                        running_col += 1
-                        running_row += 1
-                return True
-
-            if row_change > 1 and column_change < -1:
-                # moving up and to the left. if moving 1, final position already checked in make_move logic
-                running_row = ending_row_numeric - 1
-                running_col = ending_col_numeric + 1
-                for key in board_object.get_column_guide():  # for all the keys in the dict column_guide
-                    if board_object.get_column_guide()[key] == running_col and running_row > starting_row_numeric:
-                        if board_object.get_current_board()[str(running_row)][key + str(running_row)] != " ":
-                            return False
-                        running_col += 1
-                        running_row -= 1
-                return True
-
-            if row_change < -1 and column_change > 1:
-                # moving down and to the right. if moving 1, final position already checked in make_move logic
-                running_row = starting_row_numeric - 1
-                running_col = starting_col_numeric + 1
-                for key in board_object.get_column_guide():  # for all the keys in the dict column_guide
-                    if board_object.get_column_guide()[key] == running_col and running_row > ending_row_numeric:
-                        if board_object.get_current_board()[str(running_row)][key + str(running_row)] != " ":
-                            return False
-                        running_col += 1
-                        running_row -= 1
-                return True
-        else:
+        if not BISHOP_LINES[starting_index] & SQUARE_BITS[ending_index]:  # not on the same diagonal
             return False
+        return self.path_is_clear(starting_index, ending_index, board_object)
 
 
 class Queen(Pieces):
     """ the Queen  class is a subclass of the Pieces class. It represents the Queen pieces on the game board. It
-    inherits the player_color, display_letter, and position from the pieces class, and it’ll be required to generate a
+    inherits the player_color and display_letter from the pieces class, and it’ll be required to generate a
     Queen object. Will contain a method to detail valid moves for Queen pieces"""
 
-    def __init__(self, player_color, display_letter, position):
-        super().__init__(player_color, display_letter, position)
+    __slots__ = ()
 
-    def is_valid_move(self, starting_pos, ending_pos, board_object):
+    def is_valid_index_move(self, starting_index, ending_index, board_object):
         """determines if a Queen object move is valid. Will allow forward, backward, side to side, or diagonally
         (both forward and backward). Cannot jump over pieces."""
-        starting_col_numeric = int(board_object.get_column_guide()[starting_pos[0:1]])
-        starting_row_numeric = int(starting_pos[1:])
-        ending_col_numeric = int(board_object.get_column_guide()[ending_pos[0:1]])
-        ending_row_numeric = int(ending_pos[1:])
-        row_change = ending_row_numeric - starting_row_numeric
-        column_change = ending_col_numeric - starting_col_numeric
-
-        if abs(row_change) > 0 and column_change == 0:  # move up or down board. row change.
-            if ending_row_numeric > starting_row_numeric:  # moving up
-                for row_number in range(starting_row_numeric + 1, ending_row_numeric):
-                    if board_object.get_current_board()[str(row_number)][ending_pos[0:1] + str(row_number)] != " ":
-                        return False
-                return True
-            if starting_row_numeric > ending_row_numeric:   # moving down
-                for row_number in range(ending_row_numeric + 1, starting_row_numeric):
-                    if board_object.get_current_board()[str(row_number)][starting_pos[0:1] + str(row_number)] != " ":
-                        return False
-                return True
-        if abs(column_change) > 0 and row_change == 0:  # move left or right. column change.
-            if ending_col_numeric > starting_col_numeric:  # moving right
-                for col_number in range(starting_col_numeric + 1, ending_col_numeric):
-                    for key in board_object.get_column_guide():
-                        if board_object.get_column_guide()[key] == col_number:
-                            if board_object.get_current_board()[str(starting_row_numeric)][key + str(starting_row_numeric)] != " ":
-                                return False
-                return True
-            if starting_col_numeric > ending_col_numeric:  # moving left
-                for col_number in range(ending_col_numeric + 1, starting_col_numeric):
-                    for key in board_object.get_column_guide():
-                        if board_object.get_column_guide()[key] == col_number:
-                            if board_object.get_current_board()[str(starting_row_numeric)][key + str(starting_row_numeric)] != " ":
-                                return False
-                return True
-
-        if abs(row_change) == abs(column_change):  # if row change = col change, move is diagonal
-            if row_change in [-1, 1]:
-                return True
-            if row_change > 1 and column_change > 1:
-                # moving up and to the right. if moving 1, final position already checked in make_move logic
-                running_row = starting_row_numeric + 1
-                running_col = starting_col_numeric + 1
-                for key in board_object.get_column_guide():  # for all the keys in the dict column_guide
-                    if board_object.get_column_guide()[key] == running_col and running_row < ending_row_numeric:
-                        if board_object.get_current_board()[str(running_row)][key + str(running_row)] != " ":
-                            return False
-                        running_col += 1
-                        running_row += 1
-                return True
-
-            if row_change < -1 and column_change < -1:
-                # moving down and to the left. if moving 1, final position already checked in make_move logic
-                running_row = ending_row_numeric + 1
-                running_col = ending_col_numeric + 1
-                for key in board_object.get_column_guide():  # for all the keys in the dict column_guide
-                    if board_object.get_column_guide()[key] == running_col and running_row < starting_row_numeric:
-                        if board_object.get_current_board()[str(running_row)][key + str(running_row)] != " ":
-                            return False
-                        running_col += 1
-                        running_row += 1
-                return True
-
-            if row_change > 1 and column_change < -1:
-                # moving up and to the left. if moving 1, final position already checked in make_move logic
-                running_row = ending_row_numeric - 1
-                running_col = ending_col_numeric + 1
-                for key in board_object.get_column_guide():  # for all the keys in the dict column_guide
-                    if board_object.get_column_guide()[key] == running_col and running_row > starting_row_numeric:
-                        if board_object.get_current_board()[str(running_row)][key + str(running_row)] != " ":
-                            return False
-                        running_col += 1
-                        running_row -= 1
-                return True
-
-            if row_change < -1 and column_change > 1:
-                # moving down and to the right. if moving 1, final position already checked in make_move logic
-                running_row = starting_row_numeric - 1
-                running_col = starting_col_numeric + 1
-                for key in board_object.get_column_guide():  # for all the keys in the dict column_guide
-                    if board_object.get_column_guide()[key] == running_col and running_row > ending_row_numeric:
-                        if board_object.get_current_board()[str(running_row)][key + str(running_row)] != " ":
-                            return False
-                        running_col += 1
-                        running_row -= 1
-                return True
-        else:
+        if not QUEEN_LINES[starting_index] & SQUARE_BITS[ending_index]:  # not on the same row, column or diagonal
             return False
+        return self.path_is_clear(starting_index, ending_index, board_object)
 
 
 class King(Pieces):
     """ the King class is a subclass of the Pieces class. It represents the King pieces on the game board. It
-    inherits the player_color, display_letter, and position from the pieces class, and it’ll be required to generate a
+    inherits the player_color and display_letter from the pieces class, and it’ll be required to generate a
      King object. Will contain a method to detail valid moves for King pieces"""
 
-    def __init__(self, player_color, display_letter, position):
-        super().__init__(player_color, display_letter, position)
+    __slots__ = ()
 
-    def is_valid_move(self, starting_pos, ending_pos, board_object):
+    def is_valid_index_move(self, starting_index, ending_index, board_object):
         """determines if a King object move is valid. Will allow a move of one square in any direction – forward,
         backward, side to side, or diagonally, but cannot jump over pieces."""
-        starting_col_numeric = int(board_object.get_column_guide()[starting_pos[0:1]])
-        starting_row_numeric = int(starting_pos[1:])
-        ending_col_numeric = int(board_object.get_column_guide()[ending_pos[0:1]])
-        ending_row_numeric = int(ending_pos[1:])
-        row_change = ending_row_numeric - starting_row_numeric
-        column_change = ending_col_numeric - starting_col_numeric
-
         # if there is a piece in the way, will be checked by make_move logic
-        if row_change in [1, -1] and column_change == 0:  # forwards or backwards
-            return True
-        if row_change == 0 and column_change in [-1, 1]:  # side to side
-            return True
-        if row_change in [-1, 1] and column_change in [-1, 1]:  # diagonal
-            return True
-
-    def set_is_captured(self, new_value, game_object):
-        """will set the is_captured data member of the King object to True. Since this means a King is captured,
-    that also means it will set the ChessVar object’s game_status to WHITE_WON or BLACK_WON depending on the color
-    of the King being captured."""
-        self._is_captured = new_value
-        if self.get_player_color() == "white":
-            game_object.set_game_state("BLACK_WON")
-        elif self.get_player_color() == "black":
-            game_object.set_game_state("WHITE_WON")
-        return
-
+        return bool(KING_ATTACKS[starting_index] & SQUARE_BITS[ending_index])
+
+
+# the Pieces subclass for each piece type, used when building a board from piece codes
+PIECE_CLASSES = {PAWN: Pawn, KNIGHT: Knight, BISHOP: Bishop, ROOK: Rook, QUEEN: Queen, KING: King}
+# the one shared Piece object for every piece code (None for EMPTY and unused codes), indexed like PIECE_LETTERS
+PIECES_BY_CODE = [None] * 16
+for letter, code in PIECE_CODES.items():
+    PIECES_BY_CODE[code] = PIECE_CLASSES[code & 7]("black" if code & BLACK else "white", letter)
+
+# the board every new game starts from. Board() copies its arrays instead of setting the position up again
+STARTING_BOARD = Board.__new__(Board)
+STARTING_BOARD.set_instrumentation(None)
+STARTING_BOARD.set_layout([PIECE_CODES[letter] for letter in "RNBQKBNR" + "P" * 8] + [EMPTY] * 32 +
+                          [PIECE_CODES[letter] for letter in "p" * 8 + "rnbqkbnr"],
+                          sum(SQUARE_BITS[8:16]) | sum(SQUARE_BITS[48:56]))
@@ -0,0 +1,116 @@
+# Author: Katlin Hopkins
+# GitHub username: katlin706
+# Date: 10/17/2026
+# Description: Checks many ChessVar moves from many games in one call with NumPy. Boards are passed as an N x 64
+# array of the piece codes from ChessVar (the same codes the Board keeps in get_squares), and moves as an array of
+# (starting index, ending index) pairs. The answer is worked out with whole-array operations on precomputed move
+# tables, and matches what make_move would accept for each move. This module needs NumPy, the rest of ChessVar
+# does not.
+
+import numpy as np
+
+from ChessVar import SQUARE_FILE, SQUARE_RANK, SQUARE_BITS, EMPTY, PAWN, KNIGHT, BISHOP, ROOK, QUEEN, KING, BLACK
+
+
+def _build_tables():
+    """builds the move tables. Each is a 64 x 64 array of booleans indexed by (starting index, ending index), except
+    BETWEEN, which is 64 x 64 x 64 and marks the squares strictly between two squares on the same line"""
+    files = np.array(SQUARE_FILE)
+    ranks = np.array(SQUARE_RANK)
+    file_change = files[None, :] - files[:, None]
+    rank_change = ranks[None, :] - ranks[:, None]
+    moved = (file_change != 0) | (rank_change != 0)
+    straight = moved & ((file_change == 0) | (rank_change == 0))
+    diagonal = moved & (np.abs(file_change) == np.abs(rank_change))
+    knight = ((np.abs(file_change) == 1) & (np.abs(rank_change) == 2)) | \
+             ((np.abs(file_change) == 2) & (np.abs(rank_change) == 1))
+    king = moved & (np.abs(file_change) <= 1) & (np.abs(rank_change) <= 1)
+
+    between = np.zeros((64, 64, 64), dtype=bool)
+    for start in range(64):
+        for end in range(64):
+            if straight[start, end] or diagonal[start, end]:
+                step = np.sign(rank_change[start, end]) * 8 + np.sign(file_change[start, end])
+                between[start, end, list(range(start + step, end, step))] = True
+
+    # indexed by color (0 white, 1 black) first
+    pawn_push = np.stack([(file_change == 0) & (rank_change == 1), (file_change == 0) & (rank_change == -1)])
+    pawn_double = np.stack([(file_change == 0) & (rank_change == 2), (file_change == 0) & (rank_change == -2)])
+    pawn_capture = np.stack([(np.abs(file_change) == 1) & (rank_change == 1),
+                             (np.abs(file_change) == 1) & (rank_change == -1)])
+    return straight, diagonal, knight, king, between, pawn_push, pawn_double, pawn_capture
+
+
+STRAIGHT, DIAGONAL, KNIGHT_MOVES, KING_MOVES, BETWEEN, PAWN_PUSH, PAWN_DOUBLE, PAWN_CAPTURE = _build_tables()
+
+
+def encode_games(games):
+    """takes a list of ChessVar games and returns (boards, unmoved, turns): an N x 64 int8 array of piece codes, an
+    N x 64 boolean array marking pawns that have not made their first move, and an N int8 array of whose turn it is
+    (0 for white, 1 for black), ready for validate_moves"""
+    boards = np.array([game.get_board_object().get_squares() for game in games], dtype=np.int8).reshape(-1, 64)
+    unmoved = np.array([[bool(game.get_board_object().get_unmoved_pawns() & SQUARE_BITS[index])
+                         for index in range(64)] for game in games], dtype=bool).reshape(-1, 64)
+    turns = np.array([game.get_turn() == "black" for game in games], dtype=np.int8)
+    return boards, unmoved, turns
+
+
+def starting_row_pawns(boards):
+    """takes an N x 64 array of piece codes and returns the N x 64 boolean array of pawns standing on their starting
+    row. In a game played from the start these are exactly the pawns that have not moved"""
+    boards = np.asarray(boards)
+    unmoved = np.zeros(boards.shape, dtype=bool)
+    unmoved[:, 8:16] = boards[:, 8:16] == PAWN
+    unmoved[:, 48:56] = boards[:, 48:56] == BLACK | PAWN
+    return unmoved
+
+
+def validate_moves(boards, moves, unmoved=None, turns=None, game_index=None):
+    """takes an N x 64 array of piece codes and an M x 2 array of (starting index, ending index) moves, and returns
+    an array of M booleans, True where the move is legal. Move i is checked on board game_index[i], or on board i
+    when game_index is not given (then M must equal N). unmoved is an N x 64 boolean array of pawns that can still
+    move two squares, and defaults to starting_row_pawns(boards). When turns (N values, 0 for white and 1 for black)
+    is given, moving the other player's piece is also illegal. A legal move matches make_move: there is a piece on
+    the starting square, the ending square does not hold a piece of the same color, and the piece's
+    is_valid_move allows it. Whether the game is already over is not checked"""
+    boards = np.asarray(boards, dtype=np.int8)
+    moves = np.asarray(moves, dtype=np.int64).reshape(-1, 2)
+    if unmoved is None:
+        unmoved = starting_row_pawns(boards)
+    if game_index is None:
+        if len(boards) != len(moves):
+            raise ValueError("without game_index there must be one move per board")
+        game_index = np.arange(len(moves))
+    else:
+        game_index = np.asarray(game_index, dtype=np.int64)
+
+    on_board = (moves >= 0).all(axis=1) & (moves < 64).all(axis=1)
+    starts = np.where(on_board, moves[:, 0], 0)
+    ends = np.where(on_board, moves[:, 1], 0)
+    move_boards = boards[game_index]
+    move_numbers = np.arange(len(moves))
+    pieces = move_boards[move_numbers, starts]
+    targets = move_boards[move_numbers, ends]
+    piece_types = pieces & 7
+    colors = (pieces >> 3) & 1
+
+    path_clear = ~(BETWEEN[starts, ends] & (move_boards != EMPTY)).any(axis=1)
+    empty_target = targets == EMPTY
+    enemy_target = ~empty_target & (((targets >> 3) & 1) != colors)
+
+    pawn_moves = (PAWN_PUSH[colors, starts, ends] & empty_target) | \
+                 (PAWN_DOUBLE[colors, starts, ends] & empty_target & path_clear &
+                  np.asarray(unmoved, dtype=bool)[game_index, starts]) | \
+                 (PAWN_CAPTURE[colors, starts, ends] & enemy_target)
+    by_type = np.zeros((8, len(moves)), dtype=bool)
+    by_type[PAWN] = pawn_moves
+    by_type[KNIGHT] = KNIGHT_MOVES[starts, ends]
+    by_type[BISHOP] = DIAGONAL[starts, ends] & path_clear
+    by_type[ROOK] = STRAIGHT[starts, ends] & path_clear
+    by_type[QUEEN] = (STRAIGHT[starts, ends] | DIAGONAL[starts, ends]) & path_clear
+    by_type[KING] = KING_MOVES[starts, ends]
+
+    legal = on_board & (pieces != EMPTY) & (empty_target | enemy_target) & by_type[piece_types, move_numbers]
+    if turns is not None:
+        legal &= colors == np.asarray(turns)[game_index]
+    return legal
@@ -0,0 +1,341 @@
+# Author: Katlin Hopkins
+# GitHub username: katlin706
+# Date: 10/17/2026
+# Description: Benchmarks for ChessVar, so a change to move checking or the board views can be measured before it is
+# merged. Every benchmark is timed with timeit: the number of loops is raised until one timing takes long enough,
+# then the timing is repeated and the best, median, mean and standard deviation (in microseconds per call) are kept. 'run' writes the
+# results as JSON together with the Python version and git revision, and 'compare' reads two of those files and
+# shows which benchmarks got faster or slower. 'contention' runs a mix of moves and board reads on a GameRegistry
+# from more and more threads, next to the same registry behind one global lock, to show how throughput scales.
+
+import json
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import threading
+import time
+import timeit
+from contextlib import contextmanager
+
+from ChessVar import ChessVar, PIECE_CODES, EMPTY, SQUARE_INDEX, SQUARE_NAMES
+from registry import GameRegistry, VIEWPOINTS
+
+PLAYOUT_SEED = 1234
+MIDGAME_PLIES = 30
+
+
+def random_position(plies, seed):
+    """returns a ChessVar after playing the given number of random legal moves from the start, always the same
+    moves for the same seed. Stops early if a king is captured"""
+    rng = random.Random(seed)
+    game = ChessVar()
+    for _ in range(plies):
+        moves = game.generate_moves(game.get_turn())
+        if not moves:
+            break
+        game.make_move(*rng.choice(moves))
+    return game
+
+
+def open_queens_position():
+    """returns a ChessVar where each side has a king and four queens and nothing else, so the sliding piece code
+    has the longest open lines to walk. This is the worst case for move checking and for working out the views"""
+    layout = [EMPTY] * 64
+    for name, letter in (("a1", "K"), ("c3", "Q"), ("f3", "Q"), ("c6", "Q"), ("f6", "Q"),
+                         ("h8", "k"), ("d4", "q"), ("e4", "q"), ("d5", "q"), ("e5", "q")):
+        layout[SQUARE_INDEX[name]] = PIECE_CODES[letter]
+    game = ChessVar()
+    game.set_layout(layout, 0)
+    return game
+
+
+def random_playout(seed=PLAYOUT_SEED, max_plies=300):
+    """plays one full game of random legal moves through make_move, the way a player or a self-play run would, and
+    returns the number of plies played"""
+    rng = random.Random(seed)
+    game = ChessVar()
+    plies = 0
+    while game.get_game_state() == 'UNFINISHED' and plies < max_plies:
+        moves = game.generate_moves(game.get_turn())
+        if not moves:
+            break
+        game.make_move(*rng.choice(moves))
+        plies += 1
+    return plies
+
+
+def bench_make_move():
+    """make_move of a pawn's first move from the starting position, then undo_move to set up the next call"""
+    game = ChessVar()
+
+    def run():
+        game.make_move("e2", "e4")
+        game.undo_move()
+    return run
+
+
+def bench_make_move_rejected():
+    """make_move of a move that is not allowed (a pawn moving three squares), which runs all of the checks and
+    returns False"""
+    game = ChessVar()
+    return lambda: game.make_move("e2", "e5")
+
+
+def bench_get_board(viewpoint):
+    """returns a benchmark of get_board for one viewpoint on a midgame position, with the view cache off so the
+    view is worked out on every call"""
+    def make():
+        game = random_position(MIDGAME_PLIES, PLAYOUT_SEED)
+        return lambda: game.get_board(viewpoint)
+    make.__doc__ = "get_board('%s') on a position %d random plies in" % (viewpoint, MIDGAME_PLIES)
+    return make
+
+
+def bench_move_and_views():
+    """make_move followed by get_board for all three viewpoints, what a server does for every move, then
+    undo_move"""
+    game = random_position(MIDGAME_PLIES, PLAYOUT_SEED)
+    starting_pos, ending_pos = game.generate_moves(game.get_turn())[0]
+
+    def run():
+        game.make_move(starting_pos, ending_pos)
+        game.get_board("white")
+        game.get_board("black")
+        game.get_board("audience")
+        game.undo_move()
+    return run
+
+
+def bench_queens_is_valid_move():
+    """is_valid_move from every queen to every square on the open queens position (640 checks per call)"""
+    game = open_queens_position()
+    board = game.get_board_object()
+    queens = [(board.get_piece_at(index), SQUARE_NAMES[index]) for index in range(64)
+              if board.get_piece_at(index) is not None and board.get_piece_at(index).get_display_letter() in "Qq"]
+
+    def run():
+        for queen, starting_pos in queens:
+            for ending_pos in SQUARE_NAMES:
+                queen.is_valid_move(starting_pos, ending_pos, board)
+    return run
+
+
+def bench_queens_get_board():
+    """get_board('white') on the open queens position"""
+    game = open_queens_position()
+    return lambda: game.get_board("white")
+
+
+def bench_queens_generate_moves():
+    """generate_moves('white') on the open queens position"""
+    game = open_queens_position()
+    return lambda: game.generate_moves("white")
+
+
+def bench_random_playout():
+    """one full game of random legal moves, from the start until a king is captured (or 300 plies)"""
+    return random_playout
+
+
+# name -> function that sets a benchmark up and returns the zero-argument callable to time
+BENCHMARKS = {
+    "make_move": bench_make_move,
+    "make_move_rejected": bench_make_move_rejected,
+    "get_board_white": bench_get_board("white"),
+    "get_board_black": bench_get_board("black"),
+    "get_board_audience": bench_get_board("audience"),
+    "move_and_views": bench_move_and_views,
+    "queens_is_valid_move": bench_queens_is_valid_move,
+    "queens_get_board": bench_queens_get_board,
+    "queens_generate_moves": bench_queens_generate_moves,
+    "random_playout": bench_random_playout,
+}
+
+
+def time_benchmark(function, repeat=5, min_time=0.2):
+    """takes a zero-argument callable and times it with timeit. The loop count is the smallest one that takes at
+    least min_time seconds, and the timing is repeated that many times. Returns a dict of the loop count, repeat
+    count and the best, median and mean microseconds per call and their standard deviation"""
+    timer = timeit.Timer(function)
+    loops = 1
+    while True:
+        if timer.timeit(loops) >= min_time:
+            break
+        loops *= 2 if loops < 8 else 10
+    timings = [timer.timeit(loops) / loops * 1e6 for _ in range(repeat)]
+    return {"loops": loops, "repeat": repeat, "best_us": round(min(timings), 4),
+            "median_us": round(statistics.median(timings), 4), "mean_us": round(statistics.mean(timings), 4),
+            "stdev_us": round(statistics.stdev(timings), 4) if repeat > 1 else 0.0}
+
+
+def git_revision():
+    """returns the current git commit hash, or None when not run from a git checkout"""
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_benchmarks(names=None, repeat=5, min_time=0.2):
+    """takes the names of the benchmarks to run (all of them by default) and returns the results as a dict ready to
+    be written as JSON: when and where they were run, and the timings of each benchmark"""
+    results = {}
+    for name in names or BENCHMARKS:
+        results[name] = time_benchmark(BENCHMARKS[name](), repeat, min_time)
+        results[name]["description"] = " ".join(BENCHMARKS[name].__doc__.split())
+    return {"revision": git_revision(), "python": platform.python_version(),
+            "implementation": platform.python_implementation(), "machine": platform.machine(),
+            "time": time.strftime("%Y-%m-%dT%H:%M:%S"), "benchmarks": results}
+
+
+def compare_results(base, new, threshold=0.05):
+    """takes two results dicts from run_benchmarks (or their JSON files, loaded) and returns a list of (name, base
+    microseconds, new microseconds, new / base, verdict) tuples for the benchmarks in both, comparing the best time.
+    The verdict is 'faster' or 'slower' when the change is bigger than threshold (0.05 is 5%) and 'same' otherwise"""
+    rows = []
+    for name, base_timing in base["benchmarks"].items():
+        new_timing = new["benchmarks"].get(name)
+        if new_timing is None:
+            continue
+        ratio = new_timing["best_us"] / base_timing["best_us"]
+        verdict = "same"
+        if ratio > 1 + threshold:
+            verdict = "slower"
+        elif ratio < 1 - threshold:
+            verdict = "faster"
+        rows.append((name, base_timing["best_us"], new_timing["best_us"], ratio, verdict))
+    return rows
+
+
+class GlobalLockRegistry:
+    """the baseline for the contention benchmark: a GameRegistry with one shard where every operation also holds one
+    lock shared by all games, the way a registry with a single global lock would behave"""
+
+    def __init__(self):
+        self._registry = GameRegistry(shards=1)
+        self._lock = threading.Lock()
+
+    def new_game(self):
+        """adds a new game and returns its ID"""
+        with self._lock:
+            return self._registry.new_game()
+
+    def get_board(self, game_id, viewpoint):
+        """returns a game's board from a viewpoint while holding the global lock"""
+        with self._lock:
+            return self._registry.get_board(game_id, viewpoint)
+
+    @contextmanager
+    def locked(self, game_id):
+        """holds the global lock and the game's lock and gives the game's ChessVar"""
+        with self._lock, self._registry.locked(game_id) as game:
+            yield game
+
+
+def contention_worker(registry, game_ids, operations, read_ratio, seed):
+    """does operations random operations on the games in a registry: a board read from a random viewpoint with
+    probability read_ratio, otherwise a random legal move (or, once a game is over or long, taking every move back
+    so it starts again)"""
+    rng = random.Random(seed)
+    for _ in range(operations):
+        game_id = rng.choice(game_ids)
+        if rng.random() < read_ratio:
+            registry.get_board(game_id, rng.choice(VIEWPOINTS))
+            continue
+        with registry.locked(game_id) as game:
+            if game.get_game_state() != 'UNFINISHED' or len(game.get_packed_move_log()) >= 200:
+                while game.undo_move():
+                    pass
+            else:
+                game.make_move(*rng.choice(game.generate_moves(game.get_turn())))
+
+
+def run_contention(thread_counts, games=256, operations=20000, read_ratio=0.9, seed=PLAYOUT_SEED):
+    """takes a list of thread counts and, for each of them and for both a sharded GameRegistry and a
+    GlobalLockRegistry, splits the given number of operations (see contention_worker) over that many threads on
+    games new games, and times them. Returns a list of dicts with the registry kind, the thread count, the seconds
+    taken, the operations per second and how that compares with the same kind on the fewest threads"""
+    rows = []
+    for kind in ("sharded", "global"):
+        base_rate = None
+        for thread_count in thread_counts:
+            registry = GameRegistry() if kind == "sharded" else GlobalLockRegistry()
+            game_ids = [registry.new_game() for _ in range(games)]
+            per_thread = operations // thread_count
+            barrier = threading.Barrier(thread_count + 1)
+
+            def work(number):
+                barrier.wait()
+                contention_worker(registry, game_ids, per_thread, read_ratio, seed + number)
+            threads = [threading.Thread(target=work, args=(number,)) for number in range(thread_count)]
+            for thread in threads:
+                thread.start()
+            barrier.wait()
+            start_time = time.perf_counter()
+            for thread in threads:
+                thread.join()
+            seconds = time.perf_counter() - start_time
+            rate = per_thread * thread_count / seconds
+            if base_rate is None:
+                base_rate = rate
+            rows.append({"registry": kind, "threads": thread_count, "seconds": round(seconds, 3),
+                         "ops_per_second": round(rate), "scaling": round(rate / base_rate, 3)})
+    return rows
+
+
+def main():
+    """command line entry point. 'run' times the benchmarks (optionally only the named ones) and prints the JSON
+    results or writes them to --output. 'compare BASE NEW' prints a table of two result files and exits with status
+    1 if any benchmark got slower by more than --threshold. 'contention' prints the throughput of the sharded and
+    global lock registries for every --threads count as JSON lines"""
+    import argparse
+    parser = argparse.ArgumentParser(description="ChessVar benchmarks")
+    commands = parser.add_subparsers(dest="command", required=True)
+    run_parser = commands.add_parser("run")
+    run_parser.add_argument("names", nargs="*", metavar="NAME")
+    run_parser.add_argument("--repeat", type=int, default=5)
+    run_parser.add_argument("--min-time", type=float, default=0.2)
+    run_parser.add_argument("--output")
+    compare_parser = commands.add_parser("compare")
+    compare_parser.add_argument("base")
+    compare_parser.add_argument("new")
+    compare_parser.add_argument("--threshold", type=float, default=0.05)
+    contention_parser = commands.add_parser("contention")
+    contention_parser.add_argument("--threads", type=int, nargs="+", default=[1, 2, 4, 8])
+    contention_parser.add_argument("--games", type=int, default=256)
+    contention_parser.add_argument("--operations", type=int, default=20000, help="operations split over the threads")
+    contention_parser.add_argument("--read-ratio", type=float, default=0.9)
+    arguments = parser.parse_args()
+
+    if arguments.command == "run":
+        for name in arguments.names:
+            if name not in BENCHMARKS:
+                parser.error("unknown benchmark %r, choose from %s" % (name, ", ".join(BENCHMARKS)))
+        results = run_benchmarks(arguments.names, arguments.repeat, arguments.min_time)
+        if arguments.output:
+            with open(arguments.output, "w") as output:
+                json.dump(results, output, indent=2)
+        else:
+            print(json.dumps(results, indent=2))
+        for name, timing in results["benchmarks"].items():
+            print("%-24s %12.2f us" % (name, timing["best_us"]), file=sys.stderr)
+    elif arguments.command == "contention":
+        print(json.dumps({"python": platform.python_version(),
+                          "gil": sys._is_gil_enabled() if hasattr(sys, "_is_gil_enabled") else True}))
+        for row in run_contention(arguments.threads, arguments.games, arguments.operations, arguments.read_ratio):
+            print(json.dumps(row))
+    else:
+        with open(arguments.base) as base_file, open(arguments.new) as new_file:
+            rows = compare_results(json.load(base_file), json.load(new_file), arguments.threshold)
+        print("%-24s %12s %12s %8s" % ("benchmark", "base us", "new us", "ratio"))
+        for name, base_us, new_us, ratio, verdict in rows:
+            print("%-24s %12.2f %12.2f %8.3f  %s" % (name, base_us, new_us, ratio, verdict))
+        if any(row[4] == "slower" for row in rows):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,222 @@
+# Author: Katlin Hopkins
+# GitHub username: katlin706
+# Date: 10/17/2026
+# Description: An opening book for ChessVar built from game record files (see records.py). Every position in the
+# first plies of every game is keyed by ChessVar's position_key (the zobrist key of the board plus the side to
+# move), and the book keeps, for every move played from it, how many of those games white won, black won or left
+# unfinished. Building streams the records: counts are gathered in memory only up to a limit, then written out as a
+# sorted run file, and the runs are merged at the end, so the corpus is never held in memory. The book file is a
+# header and then fixed-size entries sorted by key and move, so Book can mmap it and find a position with a binary
+# search.
+
+import heapq
+import mmap
+import os
+import struct
+import tempfile
+
+from ChessVar import ChessVar, SQUARE_NAMES, SQUARE_INDEX
+from records import read_records
+
+BOOK_MAGIC = b"CVBK"
+BOOK_VERSION = 1
+BOOK_HEADER = struct.Struct("<4sBxxxQ")  # magic, version, entry count
+ENTRY = struct.Struct("<QHIII")  # position key, packed move, white wins, black wins, unfinished games
+RESULT_COLUMNS = {"WHITE_WON": 0, "BLACK_WON": 1, "UNFINISHED": 2}
+
+
+def game_entries(moves, max_plies):
+    """takes a game's moves (strings like "e2e4") and yields (position key, packed move) for each of its first
+    max_plies moves. Stops at the first move make_move does not accept"""
+    game = ChessVar()
+    for move in moves[:max_plies]:
+        key = game.position_key()
+        if not game.make_move(move[:2], move[2:]):
+            return
+        yield key, SQUARE_INDEX[move[:2]] << 6 | SQUARE_INDEX[move[2:]]
+
+
+def write_run(counts, directory):
+    """takes a dict of (position key, packed move) -> [white wins, black wins, unfinished] and writes it, sorted, to
+    a new temporary run file in directory. Returns the file's path"""
+    descriptor, path = tempfile.mkstemp(suffix=".run", dir=directory)
+    with os.fdopen(descriptor, "wb") as run_file:
+        for (key, move), (white_wins, black_wins, unfinished) in sorted(counts.items()):
+            run_file.write(ENTRY.pack(key, move, white_wins, black_wins, unfinished))
+    return path
+
+
+def read_run(path):
+    """generator that yields every entry of a run or book body file as an ENTRY tuple"""
+    with open(path, "rb") as run_file:
+        while True:
+            data = run_file.read(ENTRY.size * 4096)
+            if not data:
+                return
+            yield from ENTRY.iter_unpack(data)
+
+
+def build_book(record_paths, book_path, max_plies=16, min_games=1, max_entries=1 << 20):
+    """takes a list of record files and writes an opening book to book_path from the first max_plies moves of every
+    game in them. Moves seen in fewer than min_games games are left out. At most max_entries distinct (position,
+    move) counts are kept in memory at once before they are written out as a sorted run. Returns a dict of games
+    read, positions counted and entries written"""
+    directory = os.path.dirname(os.path.abspath(book_path))
+    runs = []
+    counts = {}
+    games = positions = 0
+    try:
+        for path in record_paths:
+            for result, moves in read_records(path):
+                games += 1
+                column = RESULT_COLUMNS[result]
+                for entry in game_entries(moves, max_plies):
+                    positions += 1
+                    totals = counts.get(entry)
+                    if totals is None:
+                        totals = counts[entry] = [0, 0, 0]
+                    totals[column] += 1
+                if len(counts) >= max_entries:
+                    runs.append(write_run(counts, directory))
+                    counts = {}
+        if counts:
+            runs.append(write_run(counts, directory))
+        counts = {}
+        entries = 0
+        with open(book_path + ".tmp", "wb") as book_file:
+            book_file.write(BOOK_HEADER.pack(BOOK_MAGIC, BOOK_VERSION, 0))
+            current = None
+            for key, move, white_wins, black_wins, unfinished in heapq.merge(*[read_run(run) for run in runs]):
+                if current is not None and current[0] == key and current[1] == move:
+                    current[2] += white_wins
+                    current[3] += black_wins
+                    current[4] += unfinished
+                    continue
+                if current is not None and sum(current[2:]) >= min_games:
+                    book_file.write(ENTRY.pack(*current))
+                    entries += 1
+                current = [key, move, white_wins, black_wins, unfinished]
+            if current is not None and sum(current[2:]) >= min_games:
+                book_file.write(ENTRY.pack(*current))
+                entries += 1
+            book_file.seek(0)
+            book_file.write(BOOK_HEADER.pack(BOOK_MAGIC, BOOK_VERSION, entries))
+        os.replace(book_path + ".tmp", book_path)
+    finally:
+        for run in runs:
+            os.remove(run)
+    return {"games": games, "positions": positions, "entries": entries, "runs": len(runs)}
+
+
+class Book:
+    """The Book class looks positions up in a book file written by build_book. The file is mapped read only with mmap,
+    so opening it reads nothing and every process using the same book shares one copy. A lookup is a binary search
+    over the sorted entries"""
+
+    def __init__(self, path):
+        self._file = open(path, "rb")
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, self._entries = BOOK_HEADER.unpack_from(self._map)
+        if magic != BOOK_MAGIC or version != BOOK_VERSION or \
+                len(self._map) != BOOK_HEADER.size + self._entries * ENTRY.size:
+            self.close()
+            raise ValueError("%s is not a ChessVar opening book" % path)
+
+    def __len__(self):
+        return self._entries
+
+    def lookup(self, key):
+        """takes a position key and returns its entries as a list of (packed move, white wins, black wins,
+        unfinished games) tuples, in packed move order. Returns an empty list if the position is not in the book"""
+        low = 0
+        high = self._entries
+        while low < high:  # find the first entry whose key is not below key
+            middle = (low + high) // 2
+            if struct.unpack_from("<Q", self._map, BOOK_HEADER.size + middle * ENTRY.size)[0] < key:
+                low = middle + 1
+            else:
+                high = middle
+        entries = []
+        while low < self._entries:
+            entry = ENTRY.unpack_from(self._map, BOOK_HEADER.size + low * ENTRY.size)
+            if entry[0] != key:
+                break
+            entries.append(entry[1:])
+            low += 1
+        return entries
+
+    def probe(self, game):
+        """takes a ChessVar game and returns the book moves for its position as a list of dictionaries, most played
+        first: the move as a (starting position, ending position) tuple, the games it was played in, how many of
+        them white won, black won or were unfinished, the score for the player to move (wins plus half of the
+        unfinished games, over games) and its weight (its share of the games played from the position). Moves the
+        game would not accept are left out. Returns an empty list if the position is not in the book"""
+        moves = []
+        total = 0
+        for packed_move, white_wins, black_wins, unfinished in self.lookup(game.position_key()):
+            move = (SQUARE_NAMES[packed_move >> 6], SQUARE_NAMES[packed_move & 63])
+            if game.check_move(*move) is None:
+                continue
+            games = white_wins + black_wins + unfinished
+            wins = white_wins if game.get_turn() == "white" else black_wins
+            moves.append({"move": move, "games": games, "white_wins": white_wins, "black_wins": black_wins,
+                          "unfinished": unfinished, "score": (wins + unfinished / 2) / games})
+            total += games
+        for move in moves:
+            move["weight"] = move["games"] / total
+        moves.sort(key=lambda move: move["games"], reverse=True)
+        return moves
+
+    def choose_move(self, game, rng):
+        """takes a ChessVar game and a random.Random and returns a book move picked at random, weighted by how often
+        it was played, or None if the position is not in the book"""
+        moves = self.probe(game)
+        if not moves:
+            return None
+        return rng.choices([move["move"] for move in moves], [move["games"] for move in moves])[0]
+
+    def close(self):
+        """unmaps and closes the book file"""
+        self._map.close()
+        self._file.close()
+
+
+def main():
+    """command line entry point. 'build BOOK RECORDS...' builds a book from record files, 'probe BOOK [MOVES...]'
+    prints the book moves after the given moves (like e2e4 e7e5) with the lookup time"""
+    import argparse
+    import json
+    import time
+    parser = argparse.ArgumentParser(description="ChessVar opening book")
+    commands = parser.add_subparsers(dest="command", required=True)
+    build_parser = commands.add_parser("build")
+    build_parser.add_argument("book")
+    build_parser.add_argument("records", nargs="+")
+    build_parser.add_argument("--max-plies", type=int, default=16)
+    build_parser.add_argument("--min-games", type=int, default=1)
+    build_parser.add_argument("--max-entries", type=int, default=1 << 20)
+    probe_parser = commands.add_parser("probe")
+    probe_parser.add_argument("book")
+    probe_parser.add_argument("moves", nargs="*")
+    arguments = parser.parse_args()
+
+    if arguments.command == "build":
+        start_time = time.perf_counter()
+        summary = build_book(arguments.records, arguments.book, arguments.max_plies, arguments.min_games,
+                             arguments.max_entries)
+        summary["seconds"] = round(time.perf_counter() - start_time, 3)
+        print(json.dumps(summary))
+    else:
+        book = Book(arguments.book)
+        game = ChessVar()
+        for move in arguments.moves:
+            if not game.make_move(move[:2], move[2:]):
+                parser.error("move %s is not legal" % move)
+        start_time = time.perf_counter()
+        moves = book.probe(game)
+        print(json.dumps({"moves": moves, "microseconds": round((time.perf_counter() - start_time) * 1e6, 1)}))
+        book.close()
+
+
+if __name__ == "__main__":
+    main()
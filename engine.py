@@ -0,0 +1,245 @@
+# Author: Katlin Hopkins
+# GitHub username: katlin706
+# Date: 10/17/2026
+# Description: A move-choosing engine for the Fog of War variation of ChessVar. The engine only uses what the player
+# to move can see (the board from get_board(color)). It fills in the hidden enemy pieces with random guesses, searches
+# every guess with alpha-beta, and plays the move that scored best across all of the guesses, stopping when it runs
+# out of time or nodes.
+
+import random
+import time
+
+from ChessVar import (ChessVar, SQUARE_BITS, SQUARE_NAMES, PIECE_CODES, EMPTY, PAWN, KNIGHT, BISHOP, ROOK, QUEEN, KING, BLACK)
+
+PIECE_VALUES = {PAWN: 100, KNIGHT: 300, BISHOP: 320, ROOK: 500, QUEEN: 900, KING: 0}
+WIN_SCORE = 1000000  # score for capturing the king, less the number of plies it takes
+STARTING_MATERIAL = [KING, QUEEN, ROOK, ROOK, BISHOP, BISHOP, KNIGHT, KNIGHT] + [PAWN] * 8
+# how much a capture on a square holding each piece code is worth trying first, used to order moves
+VICTIM_ORDER = [100000 if code & 7 == KING else PIECE_VALUES.get(code & 7, 0) for code in range(16)]
+
+
+def material_evaluation(game, color):
+    """takes a ChessVar game and a color and returns the material balance in centipawns from that color's side"""
+    board = game.get_board_object()
+    score = 0
+    for piece_type in (PAWN, KNIGHT, BISHOP, ROOK, QUEEN):
+        score += PIECE_VALUES[piece_type] * (board.get_bitboard(piece_type).bit_count() -
+                                             board.get_bitboard(BLACK | piece_type).bit_count())
+    return score if color == "white" else -score
+
+
+def mobility_evaluation(game, color):
+    """takes a ChessVar game and a color and returns material_evaluation plus a small bonus for every square the
+    color attacks more than the other player. Attacking squares is also what lets a player see enemy pieces"""
+    board = game.get_board_object()
+    other = "black" if color == "white" else "white"
+    mobility = board.get_attacked_squares(color).bit_count() - board.get_attacked_squares(other).bit_count()
+    return material_evaluation(game, color) + 4 * mobility
+
+
+class SearchStopped(Exception):
+    """raised inside the search when the time or node budget runs out"""
+
+
+class FogEngine:
+    """The FogEngine class picks moves for one side of a ChessVar game using only that side's view of the board.
+    Every call to best_move samples a number of 'worlds' (full boards that agree with the view, with guesses for the
+    hidden enemy pieces) and runs iterative-deepening alpha-beta on each of them. The evaluation function is passed
+    in, and takes a ChessVar game and a color. The seed makes the guesses, and so the moves, repeatable when the
+    search is limited by nodes rather than time. With a Tablebase (see tablebase.py), positions down to three pieces
+    are scored exactly from the tables instead of being searched"""
+
+    def __init__(self, evaluation=material_evaluation, seed=0, worlds=8, max_depth=32, tablebase=None):
+        self._evaluation = evaluation
+        self._tablebase = tablebase
+        self._random = random.Random(seed)
+        self._worlds = worlds
+        self._max_depth = max_depth
+        self._nodes = 0
+        self._node_limit = None
+        self._deadline = None
+        self._can_stop = False
+        self._statistics = {"nodes": 0, "seconds": 0.0, "nodes_per_second": 0.0, "depth": 0, "worlds": 0}
+
+    def get_statistics(self):
+        """returns a dictionary describing the last search: nodes searched, seconds taken, nodes_per_second, the
+        deepest depth finished for every world, and the number of worlds searched"""
+        return dict(self._statistics)
+
+    def best_move(self, game, time_limit=None, node_limit=None):
+        """takes a ChessVar game and returns the move the engine would play for the player whose turn it is, as a
+        (starting position, ending position) tuple in algebraic notation. Only the player's own view of the board
+        is used. time_limit is in seconds and node_limit counts positions searched; without either the search
+        goes to max_depth. Returns None if there is no move"""
+        if game.get_game_state() != 'UNFINISHED':
+            return None
+        color = game.get_turn()
+        return self.best_move_from_view(game.get_board(color), color, time_limit, node_limit)
+
+    def best_move_from_view(self, view, color, time_limit=None, node_limit=None):
+        """same as best_move, but takes the nested list from get_board(color) and the color to move instead of a
+        game, so a move can be picked for a player whose game lives somewhere else"""
+        start_time = time.perf_counter()
+        self._nodes = 0
+        self._node_limit = node_limit
+        self._deadline = start_time + time_limit if time_limit is not None else None
+        self._can_stop = False
+
+        worlds = [self.sample_world(view, color) for world_number in range(self._worlds)]
+        # the player knows where all their own pieces are and which squares are occupied, so every world has the
+        # same moves at the root
+        root_moves = worlds[0].get_board_object().generate_moves(color)
+        best_move = root_moves[0] if root_moves else None
+        depth_reached = 0
+        if len(root_moves) > 1:
+            squares = worlds[0].get_board_object().get_squares()
+            root_moves.sort(key=lambda move: VICTIM_ORDER[squares[move[1]]], reverse=True)
+            for depth in range(1, self._max_depth + 1):
+                self._can_stop = depth > 1  # always finish depth 1 so there is a move to play
+                totals = [0] * len(root_moves)
+                try:
+                    for world in worlds:
+                        for move_number, move in enumerate(root_moves):
+                            world.push(move)
+                            totals[move_number] -= self._negamax(world, depth - 1, -WIN_SCORE * 2, WIN_SCORE * 2, 1)
+                            world.pop()
+                except SearchStopped:
+                    break  # the worlds are thrown away, so there is no need to pop the unfinished moves
+                order = sorted(range(len(root_moves)), key=lambda move_number: totals[move_number], reverse=True)
+                root_moves = [root_moves[move_number] for move_number in order]
+                best_move = root_moves[0]
+                depth_reached = depth
+                if totals[order[0]] >= (WIN_SCORE - self._max_depth) * len(worlds):
+                    break  # the king can be captured in every world
+                if totals[order[0]] <= -(WIN_SCORE - self._max_depth) * len(worlds) and depth > 1:
+                    break  # every move loses, searching deeper will not help
+
+        seconds = time.perf_counter() - start_time
+        self._statistics = {"nodes": self._nodes, "seconds": seconds,
+                            "nodes_per_second": self._nodes / seconds if seconds > 0 else 0.0,
+                            "depth": depth_reached, "worlds": len(worlds)}
+        if best_move is None:
+            return None
+        return SQUARE_NAMES[best_move[0]], SQUARE_NAMES[best_move[1]]
+
+    def sample_world(self, view, color):
+        """takes a view from get_board(color) and the color it belongs to, and returns a new ChessVar game with
+        color to move whose board agrees with the view. Each "*" square gets a random enemy piece taken from the
+        pieces the enemy started with but that are not visible. The enemy king is always placed if it is not
+        visible, and pawns are never put on their own back row. Pawns on their starting row are treated as not
+        having moved"""
+        enemy_bit = 0 if color == "black" else BLACK
+        codes = [EMPTY] * 64
+        hidden_squares = []
+        pool = list(STARTING_MATERIAL)
+        for row_number, row in enumerate(view):
+            for file, symbol in enumerate(row):
+                index = (7 - row_number) * 8 + file
+                if symbol == "*":
+                    hidden_squares.append(index)
+                elif symbol != " ":
+                    codes[index] = PIECE_CODES[symbol]
+                    if codes[index] & BLACK == enemy_bit and codes[index] & 7 in pool:
+                        pool.remove(codes[index] & 7)
+
+        self._random.shuffle(pool)
+        if KING in pool:  # the game is not over, so a king that cannot be seen is hiding on one of the squares
+            pool.remove(KING)
+            pool.insert(0, KING)
+        self._random.shuffle(hidden_squares)
+        back_row = range(56, 64) if enemy_bit else range(0, 8)
+        for index in hidden_squares:
+            piece_type = pool.pop(0) if pool else KNIGHT
+            if piece_type == PAWN and index in back_row:
+                swap = next((number for number, other in enumerate(pool) if other != PAWN), None)
+                pool.append(PAWN)
+                piece_type = pool.pop(swap) if swap is not None else KNIGHT
+            codes[index] = enemy_bit | piece_type
+
+        unmoved_pawns = 0
+        for index in range(8, 16):
+            if codes[index] == PAWN:
+                unmoved_pawns |= SQUARE_BITS[index]
+        for index in range(48, 56):
+            if codes[index] == BLACK | PAWN:
+                unmoved_pawns |= SQUARE_BITS[index]
+        world = ChessVar()
+        world.set_layout(codes, unmoved_pawns, color)
+        return world
+
+    def _negamax(self, game, depth, alpha, beta, ply):
+        """alpha-beta search of one world. returns the score from the side to move's point of view"""
+        self._nodes += 1
+        if self._can_stop and (self._nodes & 1023 == 0 or self._node_limit is not None):
+            if self._node_limit is not None and self._nodes >= self._node_limit:
+                raise SearchStopped()
+            if self._deadline is not None and time.perf_counter() >= self._deadline:
+                raise SearchStopped()
+        if game.get_game_state() != 'UNFINISHED':
+            return -WIN_SCORE + ply  # the side to move has had its king captured
+        color = game.get_turn()
+        if self._tablebase is not None and game.get_board_object().get_occupied().bit_count() <= 3:
+            value = self._tablebase.probe(game)
+            if value is not None:  # the king is captured in value plies, by the side to move if it is positive
+                if value > 0:
+                    return WIN_SCORE - ply - value
+                if value < 0:
+                    return -WIN_SCORE + ply - value
+                return 0
+        if depth == 0:
+            return self._evaluation(game, color)
+        board = game.get_board_object()
+        moves = board.generate_moves(color)
+        if not moves:
+            return 0
+        squares = board.get_squares()
+        moves.sort(key=lambda move: VICTIM_ORDER[squares[move[1]]], reverse=True)
+        if squares[moves[0][1]] & 7 == KING:
+            return WIN_SCORE - ply - 1  # capturing the king ends the game, nothing can beat it
+        best = -WIN_SCORE * 2
+        for move in moves:
+            game.push(move)
+            score = -self._negamax(game, depth - 1, -beta, -alpha, ply + 1)
+            game.pop()
+            if score > best:
+                best = score
+                if score > alpha:
+                    alpha = score
+                    if alpha >= beta:
+                        break
+        return best
+
+
+def main():
+    """plays the engine against itself from the starting position with a fixed seed and node budget, printing each
+    move and the search speed, so changes to the engine or to ChessVar can be timed"""
+    import argparse
+    parser = argparse.ArgumentParser(description="FogEngine self-play speed check")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--nodes", type=int, default=5000, help="node budget per move")
+    parser.add_argument("--moves", type=int, default=20, help="plies to play")
+    parser.add_argument("--worlds", type=int, default=4)
+    arguments = parser.parse_args()
+
+    game = ChessVar()
+    engines = {"white": FogEngine(seed=arguments.seed, worlds=arguments.worlds),
+               "black": FogEngine(seed=arguments.seed + 1, worlds=arguments.worlds)}
+    total_nodes = 0
+    total_seconds = 0.0
+    for ply in range(arguments.moves):
+        engine = engines[game.get_turn()]
+        move = engine.best_move(game, node_limit=arguments.nodes)
+        if move is None:
+            break
+        statistics = engine.get_statistics()
+        total_nodes += statistics["nodes"]
+        total_seconds += statistics["seconds"]
+        print(f"{ply + 1:3d} {game.get_turn():5s} {move[0]}{move[1]}  depth {statistics['depth']}  "
+              f"{statistics['nodes_per_second']:.0f} nodes/s")
+        game.make_move(*move)
+    print(f"result {game.get_game_state()}  {total_nodes} nodes in {total_seconds:.2f}s  "
+          f"{total_nodes / total_seconds if total_seconds else 0:.0f} nodes/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,198 @@
+# Author: Katlin Hopkins
+# GitHub username: katlin706
+# Date: 10/17/2026
+# Description: Optional counters and timing histograms for ChessVar's hot paths (make_move, the board views and
+# Pieces.board_display_assist), split by operation and by piece type. An Instrumentation object is turned on per
+# game with ChessVar.enable_instrumentation, so it can be used on only a sample of live games (see
+# instrument_sample). Games without one only pay for an "is None" check. What has been collected is handed to
+# pluggable sinks as a plain dict: kept in memory, written as JSON lines, or sent to the logging module, either on
+# demand with flush or every flush_interval seconds.
+
+import json
+import logging
+import time
+
+from ChessVar import EMPTY, PIECE_LETTERS
+
+
+class Instrumentation:
+    """The Instrumentation class collects counters and timing histograms for one or more games. Timings are kept per
+    key (like 'make_move.validate' or 'make_move.validate.Q') as a count, a total, a maximum and a histogram with one
+    bucket per power of two nanoseconds, so recording a timing is cheap and the memory used never grows. Takes a list
+    of sinks (objects with an emit(snapshot) method) and optionally a number of seconds between automatic flushes"""
+
+    def __init__(self, sinks=(), flush_interval=None):
+        self._sinks = list(sinks)
+        self._flush_interval = flush_interval
+        self._next_flush = time.monotonic() + flush_interval if flush_interval is not None else None
+        self._counters = {}
+        self._timings = {}  # key -> [count, total ns, max ns, {bucket: count}]
+
+    def add_sink(self, sink):
+        """takes an object with an emit(snapshot) method and sends it every later flush"""
+        self._sinks.append(sink)
+
+    def count(self, key, amount=1):
+        """adds amount to the counter called key"""
+        self._counters[key] = self._counters.get(key, 0) + amount
+
+    def record(self, key, nanoseconds):
+        """adds one timing, in nanoseconds, to the histogram called key"""
+        timing = self._timings.get(key)
+        if timing is None:
+            timing = self._timings[key] = [0, 0, 0, {}]
+        timing[0] += 1
+        timing[1] += nanoseconds
+        if nanoseconds > timing[2]:
+            timing[2] = nanoseconds
+        bucket = nanoseconds.bit_length()  # bucket n holds timings below 2 ** n nanoseconds
+        timing[3][bucket] = timing[3].get(bucket, 0) + 1
+
+    def make_move(self, game, starting_pos, ending_pos):
+        """does the work of ChessVar.make_move for a game with instrumentation turned on, timing the checks and the
+        move itself separately (and captures apart from quiet moves), per piece type. Returns the same as make_move"""
+        squares = game.get_board_object().get_squares()
+        start_time = time.perf_counter_ns()
+        move = game.check_move(starting_pos, ending_pos)
+        checked_time = time.perf_counter_ns()
+        piece = PIECE_LETTERS[squares[move[0]] & 7] if move is not None else None
+        self.record("make_move.validate", checked_time - start_time)
+        if move is None:
+            self.count("make_move.rejected")
+            self._maybe_flush()
+            return False
+        self.record("make_move.validate." + piece, checked_time - start_time)
+        operation = "make_move.quiet" if squares[move[1]] == EMPTY else "make_move.capture"
+        game.push(move)
+        moved_time = time.perf_counter_ns()
+        self.record(operation, moved_time - checked_time)
+        self.record(operation + "." + piece, moved_time - checked_time)
+        self.count("make_move.accepted")
+        self._maybe_flush()
+        return True
+
+    def board_view(self, board, viewpoint):
+        """does the work of Board.get_board_view for a board with instrumentation turned on, timing it per viewpoint
+        and counting how many of the attack sets the view needed had to be worked out (rather than coming from the
+        board's cache). Returns the same as get_board_view"""
+        computed = viewpoint in ("white", "black") and not board.has_attacked_squares(viewpoint)
+        start_time = time.perf_counter_ns()
+        view = board.render_view(viewpoint)
+        self.record("get_board_view." + viewpoint, time.perf_counter_ns() - start_time)
+        self.count("get_board_view." + viewpoint)
+        self.count("get_board_view." + viewpoint + ".attack_sets", int(computed))
+        self._maybe_flush()
+        return view
+
+    def display_assist(self, piece, square, board, viewpoint):
+        """does the work of Pieces.board_display_assist for a board with instrumentation turned on, timing it per
+        piece type. Returns the same as board_display_assist"""
+        start_time = time.perf_counter_ns()
+        symbol = piece.display_symbol(square, board, viewpoint)
+        self.record("board_display_assist." + PIECE_LETTERS[piece.get_piece_code() & 7],
+                    time.perf_counter_ns() - start_time)
+        return symbol
+
+    def snapshot(self):
+        """returns everything collected so far as a dict that can be written as JSON: the counters, and for every
+        timing its count, mean, maximum and approximate 50th and 99th percentiles in microseconds plus the raw
+        histogram (keyed by the upper bound of each bucket in nanoseconds)"""
+        timings = {}
+        for key, (count, total, maximum, buckets) in sorted(self._timings.items()):
+            timings[key] = {"count": count, "mean_us": round(total / count / 1000, 3),
+                            "max_us": round(maximum / 1000, 3),
+                            "p50_us": round(histogram_percentile(buckets, count, 0.50) / 1000, 3),
+                            "p99_us": round(histogram_percentile(buckets, count, 0.99) / 1000, 3),
+                            "buckets": {str(1 << bucket): amount for bucket, amount in sorted(buckets.items())}}
+        return {"time": time.time(), "counters": dict(sorted(self._counters.items())), "timings": timings}
+
+    def reset(self):
+        """forgets every counter and timing"""
+        self._counters = {}
+        self._timings = {}
+
+    def flush(self, reset=False):
+        """sends a snapshot to every sink, and afterwards forgets everything if reset is True"""
+        snapshot = self.snapshot()
+        for sink in self._sinks:
+            sink.emit(snapshot)
+        if reset:
+            self.reset()
+        if self._flush_interval is not None:
+            self._next_flush = time.monotonic() + self._flush_interval
+
+    def _maybe_flush(self):
+        """flushes if flush_interval seconds have gone by since the last flush"""
+        if self._next_flush is not None and time.monotonic() >= self._next_flush:
+            self.flush()
+
+
+def histogram_percentile(buckets, count, fraction):
+    """takes a histogram from Instrumentation (bucket -> count), the total count and a fraction like 0.99, and
+    returns the upper bound in nanoseconds of the bucket holding that percentile"""
+    needed = fraction * count
+    seen = 0
+    for bucket in sorted(buckets):
+        seen += buckets[bucket]
+        if seen >= needed:
+            return 1 << bucket
+    return 0
+
+
+class MemorySink:
+    """keeps every snapshot it is sent in a list, for tests and for reading the numbers from code"""
+
+    def __init__(self):
+        self._snapshots = []
+
+    def emit(self, snapshot):
+        """stores the snapshot"""
+        self._snapshots.append(snapshot)
+
+    def get_snapshots(self):
+        """returns every snapshot sent so far, oldest first"""
+        return self._snapshots
+
+    def get_latest(self):
+        """returns the last snapshot sent, or None if there has not been one"""
+        return self._snapshots[-1] if self._snapshots else None
+
+
+class JsonLinesSink:
+    """writes every snapshot it is sent as one line of JSON to a file (opened for appending) or to an open stream.
+    Used with flush_interval this gives a periodic stats dump"""
+
+    def __init__(self, destination):
+        self._stream = open(destination, "a") if isinstance(destination, str) else destination
+        self._owns_stream = isinstance(destination, str)
+
+    def emit(self, snapshot):
+        """writes the snapshot and flushes the stream"""
+        self._stream.write(json.dumps(snapshot) + "\n")
+        self._stream.flush()
+
+    def close(self):
+        """closes the file if this sink opened it"""
+        if self._owns_stream:
+            self._stream.close()
+
+
+class LoggingSink:
+    """sends every snapshot it is sent to a logger (the 'chessvar.instrumentation' logger by default) as JSON"""
+
+    def __init__(self, logger=None, level=logging.INFO):
+        self._logger = logger if logger is not None else logging.getLogger("chessvar.instrumentation")
+        self._level = level
+
+    def emit(self, snapshot):
+        """logs the snapshot"""
+        self._logger.log(self._level, "%s", json.dumps(snapshot))
+
+
+def instrument_sample(game, instrumentation, rate, rng):
+    """takes a game, an Instrumentation, the fraction of games to instrument (like 0.01) and a random.Random, and
+    turns instrumentation on for the game with that probability. Returns True if it was turned on"""
+    if rng.random() < rate:
+        game.enable_instrumentation(instrumentation)
+        return True
+    return False
@@ -0,0 +1,145 @@
+# Author: Katlin Hopkins
+# GitHub username: katlin706
+# Date: 10/17/2026
+# Description: A load generator for server.py. It opens a number of idle connections, then plays a number of games
+# at the same time, each with one connection for white and one for black, and measures how long every move takes
+# from sending it to getting the reply. Moves are picked at random from a local copy of each game. It prints the
+# p50, p99 and max move latency and the moves per second. With --serve it starts a server in the same process first.
+
+import asyncio
+import json
+import random
+import time
+
+from ChessVar import ChessVar
+
+
+class Client:
+    """The Client class is one connection to the server. request sends a request and waits for the reply with the
+    same id, skipping any board events that arrive in between"""
+
+    def __init__(self, reader, writer):
+        self._reader = reader
+        self._writer = writer
+        self._next_id = 0
+
+    @classmethod
+    async def connect(cls, host, port):
+        """opens a connection and returns a Client for it"""
+        reader, writer = await asyncio.open_connection(host, port, limit=1 << 20)
+        return cls(reader, writer)
+
+    async def request(self, **fields):
+        """takes the fields of a request, sends it, and returns the decoded reply"""
+        self._next_id += 1
+        fields["id"] = self._next_id
+        self._writer.write((json.dumps(fields) + "\n").encode())
+        await self._writer.drain()
+        while True:
+            line = await self._reader.readline()
+            if not line:
+                raise ConnectionError("server closed the connection")
+            message = json.loads(line)
+            if message.get("id") == self._next_id:
+                return message
+
+    async def close(self):
+        """closes the connection"""
+        self._writer.close()
+        await self._writer.wait_closed()
+
+
+async def play_game(host, port, rng, max_plies, latencies):
+    """plays one random game on the server over two connections, adding every move's latency in seconds to
+    latencies. Returns the number of moves played"""
+    players = {"white": await Client.connect(host, port), "black": await Client.connect(host, port)}
+    game_id = (await players["white"].request(op="new"))["game"]
+    for role, client in players.items():
+        await client.request(op="join", game=game_id, **{"as": role})
+    local_game = ChessVar()
+    plies = 0
+    while local_game.get_game_state() == 'UNFINISHED' and plies < max_plies:
+        moves = local_game.generate_moves(local_game.get_turn())
+        if not moves:
+            break
+        move = rng.choice(moves)
+        start_time = time.perf_counter()
+        reply = await players[local_game.get_turn()].request(op="move", game=game_id, **{"from": move[0],
+                                                                                         "to": move[1]})
+        latencies.append(time.perf_counter() - start_time)
+        if not reply["ok"]:
+            raise RuntimeError(f"server rejected {move}: {reply}")
+        local_game.make_move(*move)
+        plies += 1
+    for client in players.values():
+        await client.close()
+    return plies
+
+
+def percentile(sorted_values, fraction):
+    """takes a sorted list and a fraction between 0 and 1 and returns the value at that point in the list"""
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(fraction * len(sorted_values)))]
+
+
+async def run_load(host, port, games, idle_connections, max_plies, seed):
+    """opens the idle connections, plays the games at the same time, and returns a dictionary of results"""
+    idle = []
+    for connection_number in range(idle_connections):
+        idle.append(await asyncio.open_connection(host, port))
+    rng = random.Random(seed)
+    latencies = []
+    start_time = time.perf_counter()
+    plies = await asyncio.gather(*[play_game(host, port, random.Random(rng.getrandbits(32)), max_plies, latencies)
+                                   for game_number in range(games)])
+    seconds = time.perf_counter() - start_time
+    for reader, writer in idle:
+        writer.close()
+        await writer.wait_closed()
+    latencies.sort()
+    return {"games": games, "idle_connections": idle_connections, "moves": sum(plies), "seconds": round(seconds, 3),
+            "moves_per_second": round(sum(plies) / seconds, 1),
+            "p50_ms": round(percentile(latencies, 0.50) * 1000, 3),
+            "p99_ms": round(percentile(latencies, 0.99) * 1000, 3),
+            "max_ms": round(latencies[-1] * 1000, 3) if latencies else 0.0}
+
+
+async def run_with_server(arguments):
+    """starts a server in this process if asked to, then runs the load"""
+    server = None
+    if arguments.serve:
+        from server import GameServer
+        game_server = GameServer()
+        server = await game_server.start(arguments.host, arguments.port)
+    try:
+        return await run_load(arguments.host, arguments.port, arguments.games, arguments.idle, arguments.max_plies,
+                              arguments.seed)
+    finally:
+        if server is not None:
+            # let the server notice every client has gone before shutting it down
+            for wait in range(500):
+                if game_server.get_connection_count() == 0:
+                    break
+                await asyncio.sleep(0.01)
+            server.close()
+            await server.wait_closed()
+
+
+def main():
+    """command line entry point"""
+    import argparse
+    parser = argparse.ArgumentParser(description="measure ChessVar server move latency")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--games", type=int, default=50)
+    parser.add_argument("--idle", type=int, default=0, help="idle connections to hold open during the run")
+    parser.add_argument("--max-plies", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--serve", action="store_true", help="start a server in this process first")
+    arguments = parser.parse_args()
+    print(json.dumps(asyncio.run(run_with_server(arguments))))
+
+
+if __name__ == "__main__":
+    main()
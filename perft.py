@@ -0,0 +1,126 @@
+# Author: Katlin Hopkins
+# GitHub username: katlin706
+# Date: 10/17/2026
+# Description: Perft (performance test) for the Fog of War variation of ChessVar. perft counts every line of play
+# down to a given depth under this variant's rules: there is no castling, en passant or promotion, there are no
+# checks, and capturing a king ends the line right away (it counts as one leaf, whatever depth is left). The counts
+# are a regression check for the move generator and for make_move, and the time they take measures how fast moves
+# can be generated and played. 'divide' gives the count under each root move, which narrows down where two
+# versions disagree. Deeper runs can be split across a process pool, one root move per task.
+
+import concurrent.futures
+import json
+import time
+
+from ChessVar import ChessVar, SQUARE_NAMES
+
+# perft from the starting position, to check against. the first three match standard chess and depth 4 matches
+# standard chess without the check rules, since a king cannot be captured before the fifth move
+STARTING_PERFT = {1: 20, 2: 400, 3: 8902, 4: 197742}
+
+
+def perft(game, depth):
+    """takes a ChessVar and a depth and returns the number of leaf positions reached by playing every move the
+    board's generate_moves allows to that depth. A move that captures a king is a leaf no matter how much depth is
+    left. The game is played forward with push and put back with pop, so it is left as it was"""
+    if depth == 0 or game.get_game_state() != 'UNFINISHED':
+        return 1
+    board = game.get_board_object()
+    moves = board.generate_moves(game.get_turn())
+    if depth == 1:
+        return len(moves)
+    nodes = 0
+    for move in moves:
+        game.push(move)
+        nodes += perft(game, depth - 1)
+        game.pop()
+    return nodes
+
+
+def checked_perft(game, depth):
+    """the same count as perft, but every move goes through make_move and undo_move, and at every position the moves
+    from generate_moves are compared with every move check_move accepts (trying each of the player's pieces against
+    every square). Much slower, but it makes perft check make_move's rules and not only the move generator's.
+    Raises ValueError with the position and the moves that differ if the two ever disagree"""
+    if depth == 0 or game.get_game_state() != 'UNFINISHED':
+        return 1
+    color = game.get_turn()
+    moves = game.generate_moves(color)
+    accepted = [(starting_pos, ending_pos) for starting_pos in SQUARE_NAMES for ending_pos in SQUARE_NAMES
+                if game.check_move(starting_pos, ending_pos) is not None]
+    if sorted(moves) != sorted(accepted):
+        raise ValueError("generate_moves and make_move disagree at %s: generated only %s, accepted only %s"
+                         % (game.to_fen(), sorted(set(moves) - set(accepted)), sorted(set(accepted) - set(moves))))
+    nodes = 0
+    for starting_pos, ending_pos in moves:
+        game.make_move(starting_pos, ending_pos)
+        nodes += checked_perft(game, depth - 1)
+        game.undo_move()
+    return nodes
+
+
+def divide(game, depth, checked=False):
+    """takes a ChessVar and a depth of at least 1 and returns a list of (move, count) tuples, one for every root
+    move, where move is like "e2e4" and count is the perft of the position after it at depth - 1"""
+    count = checked_perft if checked else perft
+    results = []
+    for starting_pos, ending_pos in game.generate_moves(game.get_turn()):
+        game.make_move(starting_pos, ending_pos)
+        results.append((starting_pos + ending_pos, count(game, depth - 1)))
+        game.undo_move()
+    return results
+
+
+def _divide_root_move(fen, move, depth, checked):
+    """worker task for parallel_divide: sets the game up from fen, plays move and returns (move, count)"""
+    game = ChessVar.from_fen(fen)
+    game.make_move(move[:2], move[2:])
+    return move, (checked_perft if checked else perft)(game, depth - 1)
+
+
+def parallel_divide(game, depth, workers=None, checked=False):
+    """the same as divide, but each root move is counted in a process pool of the given number of workers (None uses
+    every core). The position is sent to the workers as FEN. Results are in the same order as divide's"""
+    if game.get_game_state() != 'UNFINISHED':
+        return []
+    fen = game.to_fen()
+    moves = [starting_pos + ending_pos for starting_pos, ending_pos in game.generate_moves(game.get_turn())]
+    with concurrent.futures.ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(_divide_root_move, fen, move, depth, checked) for move in moves]
+        return [future.result() for future in futures]
+
+
+def main():
+    """command line entry point. Counts perft for every depth from 1 up to --depth and prints the nodes, time and
+    nodes per second of each as JSON. --divide prints the count under every root move at the deepest depth,
+    --workers splits each depth across a process pool, and --checked runs everything through make_move"""
+    import argparse
+    parser = argparse.ArgumentParser(description="perft move counts for ChessVar")
+    parser.add_argument("--depth", type=int, default=4)
+    parser.add_argument("--fen", help="position to count from, the starting position if not given")
+    parser.add_argument("--divide", action="store_true")
+    parser.add_argument("--workers", type=int, default=1, help="processes to split the root moves across")
+    parser.add_argument("--checked", action="store_true", help="check every position against make_move")
+    arguments = parser.parse_args()
+
+    game = ChessVar.from_fen(arguments.fen) if arguments.fen else ChessVar()
+    for depth in range(1, arguments.depth + 1):
+        start_time = time.perf_counter()
+        if arguments.workers > 1:
+            root_counts = parallel_divide(game, depth, arguments.workers, arguments.checked)
+        else:
+            root_counts = divide(game, depth, arguments.checked)
+        seconds = time.perf_counter() - start_time
+        nodes = sum(count for move, count in root_counts) if game.get_game_state() == 'UNFINISHED' else 1
+        result = {"depth": depth, "nodes": nodes, "seconds": round(seconds, 3),
+                  "nodes_per_second": round(nodes / seconds) if seconds else 0}
+        if arguments.fen is None and depth in STARTING_PERFT:
+            result["expected"] = STARTING_PERFT[depth]
+        print(json.dumps(result))
+        if arguments.divide and depth == arguments.depth:
+            for move, count in root_counts:
+                print("%s: %d" % (move, count))
+
+
+if __name__ == "__main__":
+    main()
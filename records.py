@@ -0,0 +1,165 @@
+# Author: Katlin Hopkins
+# GitHub username: katlin706
+# Date: 10/17/2026
+# Description: Reads and writes files of finished ChessVar games and replays them through make_move. There are two
+# formats. The text format is one game per line: a result letter (W for WHITE_WON, B for BLACK_WON, * for
+# UNFINISHED) followed by the moves, like "W e2e4 e7e5 d1h5". The binary format starts with the bytes CVR1, and each
+# game is a 2-byte move count, a 1-byte result and then 2 bytes per move, holding the 12-bit packed move from
+# ChessVar's get_packed_move_log. Everything is read and replayed one game at a time with generators, so memory use
+# does not grow with the size of the file.
+
+import struct
+
+from ChessVar import ChessVar, SQUARE_NAMES, SQUARE_INDEX
+
+BINARY_MAGIC = b"CVR1"
+RESULT_LETTERS = {"WHITE_WON": "W", "BLACK_WON": "B", "UNFINISHED": "*"}
+RESULT_CODES = {"UNFINISHED": 0, "WHITE_WON": 1, "BLACK_WON": 2}
+RESULTS_BY_LETTER = {letter: result for result, letter in RESULT_LETTERS.items()}
+RESULTS_BY_CODE = {code: result for result, code in RESULT_CODES.items()}
+GAME_HEADER = struct.Struct("<HB")
+
+
+def pack_move(starting_pos, ending_pos):
+    """takes a move in algebraic notation and returns it packed into 12 bits (starting index * 64 + ending index)"""
+    return SQUARE_INDEX[starting_pos] << 6 | SQUARE_INDEX[ending_pos]
+
+
+def unpack_move(packed_move):
+    """takes a 12-bit packed move and returns it as a (starting position, ending position) tuple"""
+    return SQUARE_NAMES[packed_move >> 6], SQUARE_NAMES[packed_move & 63]
+
+
+class GameRecordWriter:
+    """The GameRecordWriter class writes games to a record file one at a time, in the text format or (with
+    binary=True) the binary format. It can be used in a with statement so the file is always closed"""
+
+    def __init__(self, path, binary=False):
+        self._binary = binary
+        self._file = open(path, "wb" if binary else "w")
+        self._games_written = 0
+        if binary:
+            self._file.write(BINARY_MAGIC)
+
+    def write_game(self, moves, result):
+        """takes a list of moves, either (starting position, ending position) tuples or strings like "e2e4", and
+        the game's result ('WHITE_WON', 'BLACK_WON' or 'UNFINISHED'), and writes them as one game"""
+        moves = [move if isinstance(move, str) else move[0] + move[1] for move in moves]
+        if self._binary:
+            self._file.write(GAME_HEADER.pack(len(moves), RESULT_CODES[result]))
+            self._file.write(struct.pack(f"<{len(moves)}H", *[pack_move(move[:2], move[2:]) for move in moves]))
+        else:
+            self._file.write(" ".join([RESULT_LETTERS[result]] + moves) + "\n")
+        self._games_written += 1
+
+    def write_chess_var(self, game):
+        """takes a ChessVar game and writes its move log and game state"""
+        self.write_game(game.get_move_log(), game.get_game_state())
+
+    def get_games_written(self):
+        """returns how many games have been written"""
+        return self._games_written
+
+    def close(self):
+        """closes the file"""
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+def read_records(path):
+    """generator that yields (result, moves) for every game in a record file, where moves is a list of strings like
+    "e2e4". The format is worked out from the first bytes of the file"""
+    with open(path, "rb") as record_file:
+        binary = record_file.read(len(BINARY_MAGIC)) == BINARY_MAGIC
+    if binary:
+        yield from read_binary_records(path)
+    else:
+        yield from read_text_records(path)
+
+
+def read_text_records(path):
+    """generator that yields (result, moves) for every game in a text record file. Blank lines are skipped"""
+    with open(path) as record_file:
+        for line in record_file:
+            fields = line.split()
+            if fields:
+                yield RESULTS_BY_LETTER[fields[0]], fields[1:]
+
+
+def read_binary_records(path):
+    """generator that yields (result, moves) for every game in a binary record file"""
+    with open(path, "rb") as record_file:
+        if record_file.read(len(BINARY_MAGIC)) != BINARY_MAGIC:
+            raise ValueError(f"{path} is not a binary ChessVar record file")
+        while True:
+            header = record_file.read(GAME_HEADER.size)
+            if not header:
+                return
+            move_count, result_code = GAME_HEADER.unpack(header)
+            packed_moves = struct.unpack(f"<{move_count}H", record_file.read(2 * move_count))
+            yield RESULTS_BY_CODE[result_code], [SQUARE_NAMES[packed >> 6] + SQUARE_NAMES[packed & 63]
+                                                 for packed in packed_moves]
+
+
+def replay(records):
+    """generator that takes (result, moves) pairs, like the ones from read_records, plays each game through
+    apply_moves (which checks every move like make_move) from the starting position, and yields a dictionary for every game: its number, whether every move
+    was accepted and the final game state matches the recorded result ('valid'), the index of the first rejected
+    move ('failed_at', None if all were accepted), the plies played and the final game state"""
+    for game_number, (result, moves) in enumerate(records):
+        game = ChessVar()
+        failed_at = game.apply_moves(moves)
+        if failed_at == -1:
+            failed_at = None
+        yield {"game": game_number, "valid": failed_at is None and game.get_game_state() == result,
+               "failed_at": failed_at, "plies": len(moves) if failed_at is None else failed_at,
+               "game_state": game.get_game_state()}
+
+
+def replay_file(path):
+    """generator that replays every game in a record file, yielding the same dictionaries as replay"""
+    return replay(read_records(path))
+
+
+def main():
+    """command line entry point. 'replay FILE' re-checks every game in a record file and prints a summary with games
+    and plies per second. 'convert SOURCE DESTINATION [--binary]' rewrites a record file in the other format"""
+    import argparse
+    import json
+    import time
+    parser = argparse.ArgumentParser(description="ChessVar game record tools")
+    commands = parser.add_subparsers(dest="command", required=True)
+    replay_parser = commands.add_parser("replay")
+    replay_parser.add_argument("path")
+    convert_parser = commands.add_parser("convert")
+    convert_parser.add_argument("source")
+    convert_parser.add_argument("destination")
+    convert_parser.add_argument("--binary", action="store_true")
+    arguments = parser.parse_args()
+
+    if arguments.command == "replay":
+        start_time = time.perf_counter()
+        games = invalid = plies = 0
+        for outcome in replay_file(arguments.path):
+            games += 1
+            plies += outcome["plies"]
+            if not outcome["valid"]:
+                invalid += 1
+                print(json.dumps(outcome))
+        seconds = time.perf_counter() - start_time
+        print(json.dumps({"games": games, "invalid": invalid, "plies": plies, "seconds": round(seconds, 3),
+                          "games_per_second": round(games / seconds, 1) if seconds else 0.0,
+                          "plies_per_second": round(plies / seconds, 1) if seconds else 0.0}))
+    else:
+        with GameRecordWriter(arguments.destination, arguments.binary) as writer:
+            for result, moves in read_records(arguments.source):
+                writer.write_game(moves, result)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,216 @@
+# Author: Katlin Hopkins
+# GitHub username: katlin706
+# Date: 10/17/2026
+# Description: A thread-safe registry of many ChessVar games, for hosting them from a threaded web service. ChessVar
+# itself has no locking, and free-threaded CPython will not have a GIL to hide that, so every change to a game goes
+# through the game's own lock, and games are kept in shards (one dict and one lock per shard, picked by hashing the
+# game ID) so adding and removing games does not go through one global lock either. Reads do not lock at all: after
+# every change the game publishes an immutable snapshot (its version, turn, game state and the views rendered so
+# far), and a reader only takes the game's lock the first time a view of a new position is asked for.
+
+import threading
+from contextlib import contextmanager
+
+from ChessVar import ChessVar
+
+VIEWPOINTS = ("white", "black", "audience")
+
+
+class GameSnapshot:
+    """The GameSnapshot class is what readers of a HostedGame see: the game as it was right after one change. The
+    version, turn and game state never change once a snapshot is published. Views are added to it as they are
+    rendered, but a view once added is never changed, and views are tuples of tuples so callers cannot change
+    them either"""
+
+    __slots__ = ("_version", "_turn", "_game_state", "_views")
+
+    def __init__(self, version, turn, game_state):
+        self._version = version
+        self._turn = turn
+        self._game_state = game_state
+        self._views = {}  # viewpoint -> rendered view
+
+    def get_version(self):
+        """returns how many changes had been made to the game when this snapshot was taken"""
+        return self._version
+
+    def get_turn(self):
+        """returns whose turn it was, 'white' or 'black'"""
+        return self._turn
+
+    def get_game_state(self):
+        """returns the game state, 'UNFINISHED', 'WHITE_WON' or 'BLACK_WON'"""
+        return self._game_state
+
+    def get_view(self, viewpoint):
+        """returns the rendered view for a viewpoint, or None if nobody has asked for it yet"""
+        return self._views.get(viewpoint)
+
+    def add_view(self, viewpoint, view):
+        """stores a rendered view for a viewpoint. Only called by HostedGame, with the game's lock held, for the
+        snapshot of the position the view was rendered from"""
+        self._views[viewpoint] = view
+
+
+class HostedGame:
+    """The HostedGame class is one ChessVar in a GameRegistry together with its lock and its latest GameSnapshot.
+    make_move and locked change the game while holding the lock and publish a new snapshot before letting go of it.
+    get_board, get_turn and get_game_state read the latest snapshot without locking"""
+
+    __slots__ = ("_game", "_lock", "_snapshot")
+
+    def __init__(self, game):
+        self._game = game
+        self._lock = threading.Lock()
+        self._snapshot = None
+        self._publish(0)
+
+    def _publish(self, version):
+        """replaces the snapshot with a new one of the game as it is now. Only called with the lock held (or before
+        the game is shared)"""
+        self._snapshot = GameSnapshot(version, self._game.get_turn(), self._game.get_game_state())
+
+    def get_snapshot(self):
+        """returns the latest GameSnapshot"""
+        return self._snapshot
+
+    def get_version(self):
+        """returns how many changes have been made to the game since it was added to the registry"""
+        return self._snapshot.get_version()
+
+    def get_turn(self):
+        """returns whose turn it is, without locking"""
+        return self._snapshot.get_turn()
+
+    def get_game_state(self):
+        """returns the game state, without locking"""
+        return self._snapshot.get_game_state()
+
+    def get_board(self, viewpoint):
+        """takes a viewpoint ('white', 'black' or 'audience') and returns the board from that viewpoint as a tuple of
+        rows (each a tuple of symbols, laid out like ChessVar.get_board). Once a view of the current position has
+        been rendered this reads it from the snapshot without locking; otherwise the view is rendered with the lock
+        held and added to the latest snapshot for the readers after"""
+        view = self._snapshot.get_view(viewpoint)
+        if view is not None:
+            return view
+        if viewpoint not in VIEWPOINTS:
+            raise ValueError("%r is not a viewpoint, choose from %s" % (viewpoint, ", ".join(VIEWPOINTS)))
+        with self._lock:
+            snapshot = self._snapshot
+            view = snapshot.get_view(viewpoint)
+            if view is None:
+                view = tuple(tuple(row) for row in self._game.get_board(viewpoint))
+                snapshot.add_view(viewpoint, view)
+        return view
+
+    def make_move(self, starting_pos, ending_pos):
+        """takes a move in algebraic notation and plays it with the game's make_move while holding the lock. Returns
+        what make_move returned"""
+        with self._lock:
+            if not self._game.make_move(starting_pos, ending_pos):
+                return False
+            self._publish(self._snapshot.get_version() + 1)
+            return True
+
+    @contextmanager
+    def locked(self):
+        """context manager that holds the lock and gives the ChessVar itself, for anything make_move does not cover
+        (undo_move, apply_moves, generate_moves). A new snapshot is published when the with block ends, so the game
+        must not be kept or used after it"""
+        with self._lock:
+            try:
+                yield self._game
+            finally:
+                self._publish(self._snapshot.get_version() + 1)
+
+
+class GameRegistry:
+    """The GameRegistry class owns many HostedGame objects by game ID. Games are spread over the given number of
+    shards by the hash of their ID, and each shard has its own dict and its own lock, which is only taken to add or
+    remove a game. Looking a game up does not lock, and every other operation only locks the one game it is on, so
+    threads working on different games do not wait for each other"""
+
+    def __init__(self, shards=64):
+        self._shard_count = shards
+        self._shards = [{} for _ in range(shards)]
+        self._shard_locks = [threading.Lock() for _ in range(shards)]
+        self._id_lock = threading.Lock()
+        self._next_id = 1
+
+    def get_shard_count(self):
+        """returns how many shards the games are spread over"""
+        return self._shard_count
+
+    def _shard_index(self, game_id):
+        """returns the index of the shard holding game_id"""
+        return hash(game_id) % self._shard_count
+
+    def new_game(self):
+        """adds a new ChessVar and returns its game ID, a string like 'g1'"""
+        with self._id_lock:
+            game_id = "g%d" % self._next_id
+            self._next_id += 1
+        self.add_game(game_id)
+        return game_id
+
+    def add_game(self, game_id, game=None):
+        """takes a game ID and optionally a ChessVar (a new game if not given) and adds it. The registry owns the game
+        from then on, so it must only be changed through the registry. Returns its HostedGame. Raises ValueError if
+        the ID is already in use"""
+        hosted = HostedGame(game if game is not None else ChessVar())
+        index = self._shard_index(game_id)
+        with self._shard_locks[index]:
+            if game_id in self._shards[index]:
+                raise ValueError("game %r already exists" % (game_id,))
+            self._shards[index][game_id] = hosted
+        return hosted
+
+    def drop_game(self, game_id):
+        """removes a game. Returns True if there was a game with that ID"""
+        index = self._shard_index(game_id)
+        with self._shard_locks[index]:
+            return self._shards[index].pop(game_id, None) is not None
+
+    def get_game(self, game_id):
+        """returns the HostedGame for a game ID, or None if there is no such game"""
+        return self._shards[self._shard_index(game_id)].get(game_id)
+
+    def _hosted(self, game_id):
+        """returns the HostedGame for a game ID, raising KeyError if there is no such game"""
+        hosted = self._shards[self._shard_index(game_id)].get(game_id)
+        if hosted is None:
+            raise KeyError(game_id)
+        return hosted
+
+    def make_move(self, game_id, starting_pos, ending_pos):
+        """plays a move in a game (see HostedGame.make_move). Returns False if the move was not accepted or there is
+        no such game"""
+        hosted = self.get_game(game_id)
+        return hosted is not None and hosted.make_move(starting_pos, ending_pos)
+
+    def get_board(self, game_id, viewpoint):
+        """returns a game's board from a viewpoint (see HostedGame.get_board). Raises KeyError if there is no such
+        game"""
+        return self._hosted(game_id).get_board(viewpoint)
+
+    def get_status(self, game_id):
+        """returns a game's (version, turn, game state) without locking. Raises KeyError if there is no such game"""
+        snapshot = self._hosted(game_id).get_snapshot()
+        return snapshot.get_version(), snapshot.get_turn(), snapshot.get_game_state()
+
+    def locked(self, game_id):
+        """returns a context manager that holds a game's lock and gives its ChessVar (see HostedGame.locked). Raises
+        KeyError if there is no such game"""
+        return self._hosted(game_id).locked()
+
+    def get_game_ids(self):
+        """returns the IDs of every game, shard by shard"""
+        game_ids = []
+        for index in range(self._shard_count):
+            with self._shard_locks[index]:
+                game_ids.extend(self._shards[index])
+        return game_ids
+
+    def __len__(self):
+        return sum(len(shard) for shard in self._shards)
@@ -0,0 +1,166 @@
+# Author: Katlin Hopkins
+# GitHub username: katlin706
+# Date: 10/17/2026
+# Description: Plays many ChessVar games at once across a pool of worker processes. Each side's moves come from a
+# move policy (a function or object that takes the game and a random number generator and returns a move). Every
+# game gets its own seed worked out from one base seed, so a run can be repeated exactly no matter how many workers
+# play it. Results are handed back one game at a time as they finish.
+
+import concurrent.futures
+import json
+import os
+import random
+import time
+
+from ChessVar import ChessVar
+from engine import FogEngine, material_evaluation
+
+
+def random_policy(game, rng):
+    """move policy that plays a random move from every move the player to move can make. Returns None if there are
+    no moves"""
+    moves = game.generate_moves(game.get_turn())
+    if not moves:
+        return None
+    return rng.choice(moves)
+
+
+def capture_policy(game, rng):
+    """move policy that captures whenever it can see something to capture (the king first) and otherwise plays a
+    random move. It only looks at the player's own view of the board"""
+    color = game.get_turn()
+    moves = game.generate_moves(color)
+    if not moves:
+        return None
+    view = game.get_board(color)
+    captures = []
+    for move in moves:
+        symbol = view[8 - int(move[1][1:])]["abcdefgh".index(move[1][0])]
+        if symbol in ("k", "K"):
+            return move
+        if symbol != " ":
+            captures.append(move)
+    return rng.choice(captures or moves)
+
+
+class EnginePolicy:
+    """move policy that asks a FogEngine for every move. Takes the node budget per move, the number of worlds the
+    engine samples, and the evaluation function. The engine's seed comes from the game's random number generator,
+    so games stay repeatable. Module-level functions and objects like this one can be sent to worker processes"""
+
+    def __init__(self, node_limit=2000, worlds=4, evaluation=material_evaluation):
+        self._node_limit = node_limit
+        self._worlds = worlds
+        self._evaluation = evaluation
+
+    def __call__(self, game, rng):
+        engine = FogEngine(self._evaluation, seed=rng.getrandbits(32), worlds=self._worlds)
+        return engine.best_move(game, node_limit=self._node_limit)
+
+
+def game_seed(base_seed, game_number):
+    """takes the base seed of a run and the number of a game in it, and returns that game's seed. The seed only
+    depends on these two numbers, so it does not matter which worker plays the game"""
+    return base_seed * 1000003 + game_number
+
+
+def play_game(seed, white_policy=random_policy, black_policy=random_policy, max_plies=400):
+    """plays one game from the starting position, asking white_policy and black_policy for moves in turn, and
+    returns a dictionary with the seed, the moves (like "e2e4"), the winner (the final game state, 'UNFINISHED' if
+    max_plies ran out or a player had no moves) and the number of plies played"""
+    rng = random.Random(seed)
+    game = ChessVar()
+    policies = {"white": white_policy, "black": black_policy}
+    moves = []
+    while game.get_game_state() == 'UNFINISHED' and len(moves) < max_plies:
+        move = policies[game.get_turn()](game, rng)
+        if move is None:
+            break
+        if not game.make_move(move[0], move[1]):
+            raise ValueError(f"policy returned an invalid move {move[0]}{move[1]} in game {seed}")
+        moves.append(move[0] + move[1])
+    return {"seed": seed, "moves": moves, "winner": game.get_game_state(), "plies": len(moves)}
+
+
+def play_games(seeds, white_policy, black_policy, max_plies):
+    """plays one game for each seed in a list and returns the list of results. This is the unit of work sent to a
+    worker process, so the cost of sending work back and forth is shared by a few games"""
+    return [play_game(seed, white_policy, black_policy, max_plies) for seed in seeds]
+
+
+def run_games(games, workers=None, white_policy=random_policy, black_policy=random_policy, base_seed=0,
+              max_plies=400, chunk_size=8):
+    """generator that plays the given number of games and yields each result dictionary (see play_game) as soon as
+    its chunk of games is finished, so results are not held in memory. Games are handed out to a process pool of
+    the given number of workers (None uses every core) in chunks of chunk_size. Only a few chunks per worker are
+    queued at a time, so a run of millions of games does not queue millions of tasks. With workers=1 the games are
+    played in this process. Results come back in the order they finish, not in seed order"""
+    seeds = (game_seed(base_seed, game_number) for game_number in range(games))
+
+    def next_chunk():
+        chunk = []
+        for seed in seeds:
+            chunk.append(seed)
+            if len(chunk) == chunk_size:
+                break
+        return chunk
+
+    if workers == 1:
+        chunk = next_chunk()
+        while chunk:
+            yield from play_games(chunk, white_policy, black_policy, max_plies)
+            chunk = next_chunk()
+        return
+
+    with concurrent.futures.ProcessPoolExecutor(max_workers=workers) as pool:
+        in_flight = set()
+        queue_limit = 4 * (workers or os.cpu_count() or 1)
+        chunk = next_chunk()
+        while chunk or in_flight:
+            while chunk and len(in_flight) < queue_limit:
+                in_flight.add(pool.submit(play_games, chunk, white_policy, black_policy, max_plies))
+                chunk = next_chunk()
+            finished, in_flight = concurrent.futures.wait(in_flight,
+                                                          return_when=concurrent.futures.FIRST_COMPLETED)
+            for future in finished:
+                yield from future.result()
+
+
+def main():
+    """command line entry point. Plays a batch of games for every worker count given and prints games per second for
+    each, so scaling across cores can be compared. Results can also be written one JSON object per line"""
+    import argparse
+    parser = argparse.ArgumentParser(description="play ChessVar games across a process pool")
+    parser.add_argument("--games", type=int, default=200)
+    parser.add_argument("--workers", default="1", help="comma separated worker counts to compare, like 1,2,4")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--max-plies", type=int, default=400)
+    parser.add_argument("--chunk-size", type=int, default=8)
+    parser.add_argument("--policy", choices=("random", "capture", "engine"), default="random")
+    parser.add_argument("--output", help="file to write one JSON result per line")
+    arguments = parser.parse_args()
+
+    policy = {"random": random_policy, "capture": capture_policy, "engine": EnginePolicy()}[arguments.policy]
+    output = open(arguments.output, "w") if arguments.output else None
+    try:
+        for workers in [int(count) for count in arguments.workers.split(",")]:
+            start_time = time.perf_counter()
+            plies = 0
+            winners = {}
+            for result in run_games(arguments.games, workers, policy, policy, arguments.seed, arguments.max_plies,
+                                    arguments.chunk_size):
+                plies += result["plies"]
+                winners[result["winner"]] = winners.get(result["winner"], 0) + 1
+                if output is not None:
+                    output.write(json.dumps(result) + "\n")
+            seconds = time.perf_counter() - start_time
+            print(json.dumps({"workers": workers, "games": arguments.games, "seconds": round(seconds, 3),
+                              "games_per_second": round(arguments.games / seconds, 1),
+                              "plies_per_second": round(plies / seconds, 1), "winners": winners}))
+    finally:
+        if output is not None:
+            output.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,284 @@
+# Author: Katlin Hopkins
+# GitHub username: katlin706
+# Date: 10/17/2026
+# Description: An asyncio server that hosts many ChessVar games over TCP. Clients send one JSON object per line and
+# get one JSON object per line back. Each game has a bounded queue of moves that is worked through in order.
+# Joining a game sends the full board for the role joined, and after every accepted move the players are sent what
+# changed in their own view of the board and spectators what changed in the audience view.
+#
+# Requests (an optional "id" is copied into the reply):
+#   {"op": "new"}                                        -> {"ok": true, "game": "g1"}
+#   {"op": "join", "game": "g1", "as": "white"}          -> {"ok": true}, then board events ("as" can also be
+#                                                           "black" or "audience")
+#   {"op": "move", "game": "g1", "from": "e2", "to": "e4"} -> {"ok": true} or {"ok": false, "error": ...}
+#   {"op": "board", "game": "g1", "as": "audience"}      -> {"ok": true, "board": [...], "turn": ..., "state": ...}
+# Events pushed to joined clients:
+#   {"event": "board", "game": "g1", "as": "white", "board": [...], "turn": "white", "state": "UNFINISHED"}
+#   {"event": "delta", "game": "g1", "as": "white", "changes": [["e2", " "], ["e4", "P"]], "turn": "black",
+#    "state": "UNFINISHED"}
+
+import asyncio
+import json
+
+from ChessVar import ChessVar
+
+ROLES = ("white", "black", "audience")
+
+
+class GameSession:
+    """The GameSession class is one hosted game: the ChessVar object, the connections watching it by role, and a
+    bounded queue of move requests that a single task works through in order, so moves in one game never race each
+    other. When the queue is full new moves are turned away instead of waiting, which keeps a flooded game from
+    using up memory"""
+
+    def __init__(self, game_id, queue_size):
+        self._game_id = game_id
+        self._game = ChessVar()
+        self._game.enable_view_cache()
+        self._subscribers = {role: set() for role in ROLES}
+        self._queue = asyncio.Queue(queue_size)
+        self._task = asyncio.get_running_loop().create_task(self._process_moves())
+
+    def get_game(self):
+        """returns the ChessVar game"""
+        return self._game
+
+    def subscribe(self, connection, role):
+        """takes a Connection and a role ('white', 'black' or 'audience'), adds the connection to the people
+        watching the game in that role, and sends it the current board"""
+        self._subscribers[role].add(connection)
+        self._game.get_board_delta(role)  # the full board goes out now, so later deltas start from here
+        connection.send_bytes(self.board_event(role))
+
+    def unsubscribe(self, connection):
+        """takes a Connection and stops sending it this game's boards"""
+        for subscribers in self._subscribers.values():
+            subscribers.discard(connection)
+
+    def has_subscribers(self):
+        """returns True if any connection is watching the game"""
+        return any(self._subscribers.values())
+
+    def submit_move(self, connection, request):
+        """takes the Connection a move came from and the move request, and queues it. Returns False without queuing
+        if the game's queue is full"""
+        try:
+            self._queue.put_nowait((connection, request))
+        except asyncio.QueueFull:
+            return False
+        return True
+
+    def board_event(self, role):
+        """returns the encoded board event for a role, ready to send"""
+        return encode({"event": "board", "game": self._game_id, "as": role, "board": self._game.get_board(role),
+                       "turn": self._game.get_turn(), "state": self._game.get_game_state()})
+
+    def broadcast(self):
+        """sends every watching connection the squares that changed in the view for its role. Each role's event is
+        encoded once however many connections are watching in it"""
+        for role, subscribers in self._subscribers.items():
+            if subscribers:
+                message = encode({"event": "delta", "game": self._game_id, "as": role,
+                                  "changes": self._game.get_board_delta(role), "turn": self._game.get_turn(),
+                                  "state": self._game.get_game_state()})
+                for connection in list(subscribers):
+                    connection.send_bytes(message)
+
+    def close(self):
+        """stops the task working through the move queue"""
+        self._task.cancel()
+
+    async def _process_moves(self):
+        """works through the move queue one request at a time for as long as the session is open"""
+        while True:
+            connection, request = await self._queue.get()
+            role = connection.get_role(self._game_id)
+            if role not in ("white", "black"):
+                connection.reply(request, ok=False, error="join the game as white or black to move")
+            elif role != self._game.get_turn():
+                connection.reply(request, ok=False, error="not your turn")
+            elif self._game.make_move(request.get("from"), request.get("to")):
+                connection.reply(request, ok=True)
+                self.broadcast()
+            else:
+                connection.reply(request, ok=False, error="invalid move")
+
+
+class Connection:
+    """The Connection class is one client connected to the server. It remembers which role it joined each game in.
+    Sending never waits: if a client stops reading and more than max_write_buffer bytes pile up for it, the
+    connection is closed rather than letting it slow down the games it is watching"""
+
+    def __init__(self, writer, max_write_buffer):
+        self._writer = writer
+        self._max_write_buffer = max_write_buffer
+        self._roles = {}
+        self._closed = False
+
+    def get_role(self, game_id):
+        """takes a game id and returns the role this connection joined that game in, or None"""
+        return self._roles.get(game_id)
+
+    def set_role(self, game_id, role):
+        """takes a game id and a role and records that this connection joined the game in that role"""
+        self._roles[game_id] = role
+
+    def get_game_ids(self):
+        """returns the ids of every game this connection has joined"""
+        return list(self._roles)
+
+    def send_bytes(self, data):
+        """takes encoded bytes and queues them to be sent, closing the connection if the client is too far behind"""
+        if self._closed:
+            return
+        self._writer.write(data)
+        if self._writer.transport.get_write_buffer_size() > self._max_write_buffer:
+            self.close()
+
+    def reply(self, request, **fields):
+        """takes a request and the fields of the reply, copies the request's id into the reply, and sends it"""
+        if isinstance(request, dict) and "id" in request:
+            fields["id"] = request["id"]
+        self.send_bytes(encode(fields))
+
+    def close(self):
+        """closes the connection"""
+        if not self._closed:
+            self._closed = True
+            self._writer.close()
+
+
+class GameServer:
+    """The GameServer class accepts connections and routes their requests to GameSession objects. queue_size bounds
+    each game's queue of waiting moves, and max_write_buffer bounds how much can be waiting to be sent to one client.
+    A game is dropped once it is over and nobody is watching it"""
+
+    def __init__(self, queue_size=32, max_write_buffer=1 << 20):
+        self._queue_size = queue_size
+        self._max_write_buffer = max_write_buffer
+        self._sessions = {}
+        self._games_created = 0
+        self._connections = 0
+
+    def get_session(self, game_id):
+        """takes a game id and returns its GameSession, or None"""
+        return self._sessions.get(game_id)
+
+    def get_connection_count(self):
+        """returns how many clients are connected"""
+        return self._connections
+
+    def new_game(self):
+        """creates a game and returns its id"""
+        self._games_created += 1
+        game_id = f"g{self._games_created}"
+        self._sessions[game_id] = GameSession(game_id, self._queue_size)
+        return game_id
+
+    async def start(self, host="127.0.0.1", port=8765):
+        """starts listening and returns the asyncio server"""
+        return await asyncio.start_server(self.handle_connection, host, port, limit=1 << 16, backlog=4096)
+
+    async def handle_connection(self, reader, writer):
+        """reads requests from one client until it disconnects. Replies to requests are sent straight away, moves
+        are handed to their game's queue"""
+        connection = Connection(writer, self._max_write_buffer)
+        self._connections += 1
+        try:
+            while True:
+                try:
+                    line = await reader.readline()
+                except (ConnectionError, ValueError):  # ValueError means the line was longer than the limit
+                    break
+                if not line:
+                    break
+                try:
+                    request = json.loads(line)
+                except ValueError:
+                    connection.reply(None, ok=False, error="not JSON")
+                    continue
+                if not isinstance(request, dict):
+                    connection.reply(None, ok=False, error="requests must be JSON objects")
+                    continue
+                self.handle_request(connection, request)
+                await writer.drain()
+        finally:
+            self._connections -= 1
+            for game_id in connection.get_game_ids():
+                session = self._sessions.get(game_id)
+                if session is not None:
+                    session.unsubscribe(connection)
+                    self.drop_if_finished(game_id)
+            connection.close()
+
+    def handle_request(self, connection, request):
+        """takes a Connection and a decoded request and carries it out"""
+        op = request.get("op")
+        if op == "new":
+            connection.reply(request, ok=True, game=self.new_game())
+            return
+        game_id = request.get("game")
+        session = self._sessions.get(game_id) if isinstance(game_id, str) else None
+        if session is None:
+            connection.reply(request, ok=False, error="no such game")
+        elif op == "join":
+            role = request.get("as")
+            if role not in ROLES:
+                connection.reply(request, ok=False, error="'as' must be white, black or audience")
+                return
+            connection.set_role(game_id, role)
+            connection.reply(request, ok=True)
+            session.subscribe(connection, role)
+        elif op == "move":
+            if not session.submit_move(connection, request):
+                connection.reply(request, ok=False, error="busy")
+        elif op == "board":
+            role = request.get("as", "audience")
+            if role not in ROLES:
+                connection.reply(request, ok=False, error="'as' must be white, black or audience")
+                return
+            game = session.get_game()
+            connection.reply(request, ok=True, board=game.get_board(role), turn=game.get_turn(),
+                             state=game.get_game_state())
+        else:
+            connection.reply(request, ok=False, error=f"unknown op {op!r}")
+
+    def drop_if_finished(self, game_id):
+        """takes a game id and forgets the game if it is over and nobody is watching it"""
+        session = self._sessions.get(game_id)
+        if session is not None and not session.has_subscribers() and \
+                session.get_game().get_game_state() != 'UNFINISHED':
+            session.close()
+            del self._sessions[game_id]
+
+
+def encode(message):
+    """takes a message and returns it as one line of JSON in bytes"""
+    return (json.dumps(message, separators=(",", ":")) + "\n").encode()
+
+
+async def serve(host, port, queue_size):
+    """runs a GameServer until the process is stopped"""
+    game_server = GameServer(queue_size)
+    server = await game_server.start(host, port)
+    print(f"serving ChessVar on {host}:{port}")
+    async with server:
+        await server.serve_forever()
+
+
+def main():
+    """command line entry point"""
+    import argparse
+    parser = argparse.ArgumentParser(description="host ChessVar games over TCP with newline-delimited JSON")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--queue-size", type=int, default=32)
+    arguments = parser.parse_args()
+    try:
+        asyncio.run(serve(arguments.host, arguments.port, arguments.queue_size))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,255 @@
+# Author: Katlin Hopkins
+# GitHub username: katlin706
+# Date: 10/17/2026
+# Description: Endgame tablebases for the Fog of War variation of ChessVar. The variant is won by capturing the king
+# and has no check or stalemate, so standard chess tablebases do not apply. For a king and one piece against a lone
+# king (KQvK, KRvK, KPvK, and also KBvK and KNvK) every position is solved by retrograde analysis under the moves
+# the Board's generate_moves allows: win or loss for the player to move and in how many plies the king is captured,
+# or a draw. Each table is written as a small binary file of signed bytes. Tablebase reads the files with mmap, so
+# any number of processes share one copy of the data in the page cache and opening a table costs nothing. Tables
+# are built in parallel across a process pool. Building needs numpy; looking positions up does not.
+
+import concurrent.futures
+import mmap
+import os
+import struct
+
+from ChessVar import (Board, EMPTY, PAWN, KNIGHT, BISHOP, ROOK, QUEEN, KING, BLACK, SQUARE_BITS, SQUARE_RANK,
+                      KING_ATTACKS)
+
+TABLE_MAGIC = b"CVTB"
+TABLE_VERSION = 1
+TABLE_HEADER = struct.Struct("<4sB11s")  # magic, version, material name
+TABLE_SUFFIX = ".cvtb"
+TABLE_SIZE = 2 * 64 * 64 * 64  # side to move, white king, black king and piece squares
+# the piece the stronger side has in each table, which is always white in the file (see Tablebase.probe)
+MATERIALS = {"KQvK": QUEEN, "KRvK": ROOK, "KPvK": PAWN, "KBvK": BISHOP, "KNvK": KNIGHT}
+DEFAULT_MATERIALS = ("KQvK", "KRvK", "KPvK")
+MAX_DISTANCE = 127  # the most plies a signed byte can hold
+
+
+def table_index(turn, white_king, black_king, piece):
+    """takes whose turn it is (0 for white, 1 for black) and the squares of the white king, the black king and the
+    white piece, and returns the position's index in a table"""
+    return ((turn * 64 + white_king) * 64 + black_king) * 64 + piece
+
+
+def king_versus_king(turn_king, other_king):
+    """returns the value of a position with only the two kings left, for the player to move: 1 (they capture the
+    other king now) if the kings are next to each other, otherwise 0. Neither king can ever safely step next to the
+    other, so every other position is a draw"""
+    return 1 if KING_ATTACKS[turn_king] & SQUARE_BITS[other_king] else 0
+
+
+def build_table(material):
+    """takes a material name from MATERIALS and returns its table as bytes: one signed byte per index (see
+    table_index) holding n if the player to move captures the king in n plies with best play, -n if their own king
+    is captured in n plies, and 0 for a draw or for an index that is not a position (two pieces on one square, or a
+    pawn on its first rank). A pawn on its starting rank is treated as not having moved yet"""
+    import numpy as np
+    piece_type = MATERIALS[material]
+    board = Board.__new__(Board)
+    board.set_instrumentation(None)
+    values = np.zeros(TABLE_SIZE, dtype=np.int16)
+    offsets = np.zeros(TABLE_SIZE + 1, dtype=np.int64)
+    children = []  # index of the position after every move, or -1 when the move captures the white piece
+    captured_values = []  # for moves that capture the white piece, the value of the two-king position left
+
+    for index in range(TABLE_SIZE):
+        offsets[index] = len(children)
+        turn, white_king, black_king, piece = index >> 18, index >> 12 & 63, index >> 6 & 63, index & 63
+        if white_king == black_king or piece in (white_king, black_king) or \
+                (piece_type == PAWN and SQUARE_RANK[piece] == 0):
+            continue
+        layout = [EMPTY] * 64
+        layout[white_king] = KING
+        layout[black_king] = BLACK | KING
+        layout[piece] = piece_type
+        board.set_layout(layout, SQUARE_BITS[piece] if piece_type == PAWN and SQUARE_RANK[piece] == 1 else 0)
+        color = "black" if turn else "white"
+        if board.can_capture_king(color):
+            values[index] = 1
+            continue
+        for starting_index, ending_index in board.generate_moves(color):
+            if turn == 0:
+                if starting_index == white_king:
+                    children.append(table_index(1, ending_index, black_king, piece))
+                else:
+                    children.append(table_index(1, white_king, black_king, ending_index))
+            elif ending_index == piece:
+                children.append(-1)
+                captured_values.append(king_versus_king(white_king, ending_index))
+            else:
+                children.append(table_index(0, white_king, ending_index, piece))
+    offsets[TABLE_SIZE] = len(children)
+
+    children = np.array(children, dtype=np.int64)
+    external = children < 0
+    external_values = np.zeros(len(children), dtype=np.int16)
+    external_values[external] = captured_values
+    children[external] = 0
+    move_counts = np.diff(offsets)
+    with_moves = move_counts > 0
+    starts = offsets[:-1][with_moves]
+    for distance in range(2, MAX_DISTANCE + 1):
+        child_values = np.where(external, external_values, values[children])
+        unresolved = (values == 0) & with_moves
+        # a win in distance plies needs a move to a position that is lost in distance - 1, and a loss needs every
+        # move to lead to a position that is won (the longest of them then takes distance - 1 plies)
+        wins = np.zeros(TABLE_SIZE, dtype=bool)
+        wins[with_moves] = np.add.reduceat((child_values == 1 - distance).astype(np.int32), starts) > 0
+        losses = np.zeros(TABLE_SIZE, dtype=bool)
+        losses[with_moves] = np.add.reduceat((child_values > 0).astype(np.int32), starts) == move_counts[with_moves]
+        wins &= unresolved
+        losses &= unresolved & ~wins
+        if not wins.any() and not losses.any():
+            break
+        values[wins] = distance
+        values[losses] = -distance
+    else:
+        raise ValueError("%s has positions more than %d plies from the end" % (material, MAX_DISTANCE))
+    return values.astype(np.int8).tobytes()
+
+
+def write_table(material, directory):
+    """builds the table for material and writes it to directory as <material>.cvtb. Returns the file's path"""
+    data = build_table(material)
+    path = os.path.join(directory, material + TABLE_SUFFIX)
+    with open(path + ".tmp", "wb") as table_file:
+        table_file.write(TABLE_HEADER.pack(TABLE_MAGIC, TABLE_VERSION, material.encode("ascii")))
+        table_file.write(data)
+    os.replace(path + ".tmp", path)
+    return path
+
+
+def build_tables(materials=DEFAULT_MATERIALS, directory=".", workers=None):
+    """builds and writes the tables for every material given, one table per task in a process pool of the given
+    number of workers (None uses every core; 1 builds them in this process). Returns the paths written"""
+    os.makedirs(directory, exist_ok=True)
+    if workers == 1:
+        return [write_table(material, directory) for material in materials]
+    with concurrent.futures.ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(write_table, materials, [directory] * len(materials)))
+
+
+class Tablebase:
+    """The Tablebase class looks positions up in the table files in a directory. Every file is mapped read only with
+    mmap when the Tablebase is created, so no data is read until a position is probed and every process using the
+    same files shares them. Positions where the extra piece is black are looked up by flipping the board, since the
+    tables are always written with the stronger side as white"""
+
+    def __init__(self, directory="."):
+        self._tables = {}  # piece type -> (open file, mmap)
+        for material, piece_type in MATERIALS.items():
+            path = os.path.join(directory, material + TABLE_SUFFIX)
+            if not os.path.exists(path):
+                continue
+            table_file = open(path, "rb")
+            table = mmap.mmap(table_file.fileno(), 0, access=mmap.ACCESS_READ)
+            magic, version, name = TABLE_HEADER.unpack_from(table)
+            if magic != TABLE_MAGIC or version != TABLE_VERSION or name.rstrip(b"\0") != material.encode("ascii") \
+                    or len(table) != TABLE_HEADER.size + TABLE_SIZE:
+                table.close()
+                table_file.close()
+                raise ValueError("%s is not a %s table" % (path, material))
+            self._tables[piece_type] = (table_file, table)
+
+    def get_materials(self):
+        """returns the names of the materials this Tablebase has a table for"""
+        return [material for material, piece_type in MATERIALS.items() if piece_type in self._tables]
+
+    def probe(self, game):
+        """takes a ChessVar game and returns the value of its position for the player to move: n if they capture
+        the other king in n plies with best play, -n if their own king is captured in n plies, 0 for a draw. Returns
+        None if the game is over or there is no table for the material on the board. Positions with only the two
+        kings are worked out without a table"""
+        if game.get_game_state() != 'UNFINISHED':
+            return None
+        board = game.get_board_object()
+        turn = 1 if game.get_turn() == "black" else 0
+        white_king = board.get_king_square("white")
+        black_king = board.get_king_square("black")
+        others = board.get_occupied() ^ SQUARE_BITS[white_king] ^ SQUARE_BITS[black_king]
+        if not others:
+            return king_versus_king(black_king if turn else white_king, white_king if turn else black_king)
+        if others & (others - 1):
+            return None
+        piece = others.bit_length() - 1
+        piece_code = board.get_squares()[piece]
+        entry = self._tables.get(piece_code & 7)
+        if entry is None:
+            return None
+        if piece_code & 7 == PAWN and \
+                bool(board.get_unmoved_pawns() & others) != (SQUARE_RANK[piece] == (6 if piece_code & BLACK else 1)):
+            return None  # the tables assume a pawn is unmoved exactly when it is on its starting rank
+        if piece_code & BLACK:  # flip the board so the side with the piece is white
+            turn, white_king, black_king, piece = 1 - turn, black_king ^ 56, white_king ^ 56, piece ^ 56
+        value = entry[1][TABLE_HEADER.size + table_index(turn, white_king, black_king, piece)]
+        return value - 256 if value > 127 else value
+
+    def best_move(self, game):
+        """takes a ChessVar game and returns the move with the best table value for the player to move, as a
+        (starting position, ending position) tuple: the fastest win, else a draw, else the slowest loss. Returns
+        None if probe has no value for the position"""
+        if self.probe(game) is None:
+            return None
+        best_move = None
+        best_score = None
+        for move in game.generate_moves(game.get_turn()):
+            game.make_move(*move)
+            value = self.probe(game)
+            game.undo_move()
+            if value is None:
+                score = 1000  # captured the king
+            elif value < 0:
+                score = 500 + value
+            elif value > 0:
+                score = -500 + value
+            else:
+                score = 0
+            if best_score is None or score > best_score:
+                best_move, best_score = move, score
+        return best_move
+
+    def close(self):
+        """unmaps and closes every table file"""
+        for table_file, table in self._tables.values():
+            table.close()
+            table_file.close()
+        self._tables = {}
+
+
+def main():
+    """command line entry point. 'build' writes the tables for the materials given (KQvK, KRvK and KPvK by default)
+    into --directory. 'probe FEN' prints the value of a position from the tables in --directory"""
+    import argparse
+    import json
+    import time
+    from ChessVar import ChessVar
+    parser = argparse.ArgumentParser(description="ChessVar endgame tablebases")
+    commands = parser.add_subparsers(dest="command", required=True)
+    build_parser = commands.add_parser("build")
+    build_parser.add_argument("materials", nargs="*", metavar="MATERIAL")
+    build_parser.add_argument("--directory", default=".")
+    build_parser.add_argument("--workers", type=int)
+    probe_parser = commands.add_parser("probe")
+    probe_parser.add_argument("fen")
+    probe_parser.add_argument("--directory", default=".")
+    arguments = parser.parse_args()
+
+    if arguments.command == "build":
+        for material in arguments.materials:
+            if material not in MATERIALS:
+                parser.error("unknown material %r, choose from %s" % (material, ", ".join(MATERIALS)))
+        start_time = time.perf_counter()
+        paths = build_tables(arguments.materials or DEFAULT_MATERIALS, arguments.directory, arguments.workers)
+        print(json.dumps({"tables": paths, "seconds": round(time.perf_counter() - start_time, 3)}))
+    else:
+        tablebase = Tablebase(arguments.directory)
+        game = ChessVar.from_fen(arguments.fen)
+        print(json.dumps({"value": tablebase.probe(game), "best_move": tablebase.best_move(game)}))
+        tablebase.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,283 @@
+# Author: Katlin Hopkins
+# GitHub username: katlin706
+# Date: 10/17/2026
+# Description: Keeps live ChessVar games safe across restarts. A GameStore hosts games by number and appends every
+# accepted move to a write-ahead log before it counts as saved. Log records are collected in memory and written and
+# fsynced together (group commit), so one fsync covers a whole batch of moves. Every so often checkpoint writes a
+# snapshot of every game as FEN and starts a new log segment, and the older log segments are deleted. After a
+# restart, GameStore.recover loads the latest snapshot and replays only the log written after it.
+#
+# Files in the store's directory:
+#   log-<n>.wal       log segment n: 11-byte records of (type, game number, packed move, crc32)
+#   snapshot-<n>.json every game at the moment segment n was started, one JSON object per line after a header line
+
+import json
+import os
+import struct
+import time
+import zlib
+
+from ChessVar import ChessVar, SQUARE_NAMES, SQUARE_INDEX
+
+RECORD = struct.Struct("<BIH")  # record type, game number, packed move (start index * 64 + end index)
+RECORD_CRC = struct.Struct("<I")
+RECORD_SIZE = RECORD.size + RECORD_CRC.size
+NEW_GAME = 1
+MOVE = 2
+DROP_GAME = 3
+
+
+def segment_path(directory, number):
+    """returns the path of log segment number in directory"""
+    return os.path.join(directory, "log-%08d.wal" % number)
+
+
+def snapshot_path(directory, number):
+    """returns the path of the snapshot taken when log segment number was started"""
+    return os.path.join(directory, "snapshot-%08d.json" % number)
+
+
+def numbered_files(directory, prefix, suffix):
+    """returns the numbers of every file in directory named prefix<number>suffix, lowest first"""
+    numbers = []
+    for name in os.listdir(directory):
+        if name.startswith(prefix) and name.endswith(suffix) and name[len(prefix):-len(suffix)].isdigit():
+            numbers.append(int(name[len(prefix):-len(suffix)]))
+    return sorted(numbers)
+
+
+def read_segment(path):
+    """generator that yields (record type, game number, packed move) for every record in a log segment. Stops at
+    the first record that is cut short or fails its checksum, which is where a crash interrupted a write"""
+    with open(path, "rb") as segment:
+        data = segment.read()
+    for offset in range(0, len(data) - RECORD_SIZE + 1, RECORD_SIZE):
+        body = data[offset:offset + RECORD.size]
+        if RECORD_CRC.unpack_from(data, offset + RECORD.size)[0] != zlib.crc32(body):
+            return
+        yield RECORD.unpack(body)
+
+
+def fsync_directory(directory):
+    """fsyncs a directory so files created, renamed or deleted in it survive a crash"""
+    descriptor = os.open(directory, os.O_RDONLY)
+    try:
+        os.fsync(descriptor)
+    finally:
+        os.close(descriptor)
+
+
+class GameStore:
+    """The GameStore class holds live ChessVar games, numbered from 1, and logs every change to them in its
+    directory. Changes are buffered and only safe once commit has run: commit is called automatically when
+    batch_size records are waiting or when commit_interval seconds have gone by since the oldest one (checked on the
+    next change), and the caller should also call it on a timer, and before telling a player their move is saved.
+    Use GameStore.recover to open a directory that already has games in it"""
+
+    def __init__(self, directory, batch_size=512, commit_interval=0.01, segment=1):
+        self._directory = directory
+        self._batch_size = batch_size
+        self._commit_interval = commit_interval
+        self._games = {}
+        self._next_game = 1
+        self._buffer = bytearray()
+        self._pending = 0  # records in the buffer
+        self._oldest_pending = None  # time the oldest record in the buffer was added
+        self._statistics = {"records": 0, "commits": 0, "commit_seconds": 0.0, "snapshots": 0,
+                            "snapshot_seconds": 0.0}
+        os.makedirs(directory, exist_ok=True)
+        self._segment = segment
+        self._log = open(segment_path(directory, segment), "ab", buffering=0)
+        fsync_directory(directory)
+
+    @classmethod
+    def recover(cls, directory, batch_size=512, commit_interval=0.01):
+        """takes a directory written by a GameStore and returns a new GameStore holding every game as of its last
+        commit: the latest complete snapshot is loaded and the log segments written after it are replayed. New
+        changes go to a fresh log segment. Moves played before the snapshot cannot be taken back in the recovered
+        games. The time taken and the amount replayed are in get_statistics under "recovery". Raises ValueError if a
+        logged move is not legal in its recovered game"""
+        start_time = time.perf_counter()
+        os.makedirs(directory, exist_ok=True)
+        snapshots = numbered_files(directory, "snapshot-", ".json")
+        segments = numbered_files(directory, "log-", ".wal")
+        games = {}
+        next_game = 1
+        first_segment = 1
+        if snapshots:
+            first_segment = snapshots[-1]
+            with open(snapshot_path(directory, first_segment)) as snapshot:
+                next_game = json.loads(snapshot.readline())["next_game"]
+                for line in snapshot:
+                    entry = json.loads(line)
+                    games[entry["game"]] = ChessVar.from_fen(entry["fen"])
+        replayed = 0
+        for number in segments:
+            if number < first_segment:
+                continue
+            for record_type, game_number, packed_move in read_segment(segment_path(directory, number)):
+                replayed += 1
+                if record_type == NEW_GAME:
+                    games[game_number] = ChessVar()
+                    next_game = max(next_game, game_number + 1)
+                elif record_type == DROP_GAME:
+                    games.pop(game_number, None)
+                elif not games[game_number].make_move(SQUARE_NAMES[packed_move >> 6], SQUARE_NAMES[packed_move & 63]):
+                    raise ValueError("logged move %s%s is not legal in game %d" % (
+                        SQUARE_NAMES[packed_move >> 6], SQUARE_NAMES[packed_move & 63], game_number))
+        store = cls(directory, batch_size, commit_interval, max(segments + snapshots + [0]) + 1)
+        store._games = games
+        store._next_game = next_game
+        store._statistics["recovery"] = {"games": len(games), "snapshot": first_segment if snapshots else None,
+                                         "records_replayed": replayed,
+                                         "seconds": round(time.perf_counter() - start_time, 6)}
+        return store
+
+    def get_game(self, game_number):
+        """returns the ChessVar for a game number, or None if there is no such game"""
+        return self._games.get(game_number)
+
+    def get_game_numbers(self):
+        """returns the numbers of every game in the store"""
+        return list(self._games)
+
+    def get_statistics(self):
+        """returns a dictionary of records logged, commits made and the seconds spent in them, snapshots written
+        and the seconds spent on them, and (for a recovered store) how the recovery went"""
+        return dict(self._statistics)
+
+    def new_game(self):
+        """starts a new game and returns its number"""
+        game_number = self._next_game
+        self._next_game += 1
+        self._games[game_number] = ChessVar()
+        self._append(NEW_GAME, game_number, 0)
+        return game_number
+
+    def make_move(self, game_number, starting_pos, ending_pos):
+        """takes a game number and a move in algebraic notation and plays it with make_move, logging it if it was
+        accepted. Returns what make_move returned, or False if there is no such game"""
+        game = self._games.get(game_number)
+        if game is None or not game.make_move(starting_pos, ending_pos):
+            return False
+        self._append(MOVE, game_number, SQUARE_INDEX[starting_pos] << 6 | SQUARE_INDEX[ending_pos])
+        return True
+
+    def drop_game(self, game_number):
+        """removes a game (once it is finished and nobody is watching it) so it is not recovered after a restart"""
+        if self._games.pop(game_number, None) is not None:
+            self._append(DROP_GAME, game_number, 0)
+
+    def _append(self, record_type, game_number, packed_move):
+        """adds one record to the buffer and commits if the batch is full or the oldest record has waited long
+        enough"""
+        body = RECORD.pack(record_type, game_number, packed_move)
+        self._buffer += body
+        self._buffer += RECORD_CRC.pack(zlib.crc32(body))
+        self._pending += 1
+        if self._oldest_pending is None:
+            self._oldest_pending = time.monotonic()
+        if self._pending >= self._batch_size or time.monotonic() - self._oldest_pending >= self._commit_interval:
+            self.commit()
+
+    def commit(self):
+        """writes every buffered record to the log and fsyncs it, making them safe. Returns how many records were
+        committed"""
+        if not self._pending:
+            return 0
+        start_time = time.perf_counter()
+        self._log.write(self._buffer)
+        os.fsync(self._log.fileno())
+        committed = self._pending
+        self._buffer = bytearray()
+        self._pending = 0
+        self._oldest_pending = None
+        self._statistics["records"] += committed
+        self._statistics["commits"] += 1
+        self._statistics["commit_seconds"] += time.perf_counter() - start_time
+        return committed
+
+    def checkpoint(self):
+        """commits, starts a new log segment, writes a snapshot of every game as it is at the start of that
+        segment, and then deletes the older segments and snapshots, which recovery no longer needs"""
+        start_time = time.perf_counter()
+        self.commit()
+        self._log.close()
+        self._segment += 1
+        self._log = open(segment_path(self._directory, self._segment), "ab", buffering=0)
+        path = snapshot_path(self._directory, self._segment)
+        with open(path + ".tmp", "w") as snapshot:
+            snapshot.write(json.dumps({"segment": self._segment, "next_game": self._next_game,
+                                       "games": len(self._games)}) + "\n")
+            for game_number, game in self._games.items():
+                snapshot.write(json.dumps({"game": game_number, "fen": game.to_fen()}) + "\n")
+            snapshot.flush()
+            os.fsync(snapshot.fileno())
+        os.replace(path + ".tmp", path)
+        fsync_directory(self._directory)
+        for number in numbered_files(self._directory, "log-", ".wal"):
+            if number < self._segment:
+                os.remove(segment_path(self._directory, number))
+        for number in numbered_files(self._directory, "snapshot-", ".json"):
+            if number < self._segment:
+                os.remove(snapshot_path(self._directory, number))
+        self._statistics["snapshots"] += 1
+        self._statistics["snapshot_seconds"] += time.perf_counter() - start_time
+
+    def close(self):
+        """commits anything buffered and closes the log"""
+        self.commit()
+        self._log.close()
+
+
+def main():
+    """command line entry point. Plays random moves in many games through a GameStore (with a checkpoint part way
+    through), reports the time per logged move and per commit, then recovers the directory as if after a restart
+    and reports how long that took and whether every game came back the same"""
+    import argparse
+    import random
+    parser = argparse.ArgumentParser(description="GameStore write and recovery benchmark")
+    parser.add_argument("directory")
+    parser.add_argument("--games", type=int, default=2000)
+    parser.add_argument("--moves", type=int, default=40, help="random moves to play in every game")
+    parser.add_argument("--batch-size", type=int, default=512)
+    parser.add_argument("--seed", type=int, default=0)
+    arguments = parser.parse_args()
+
+    rng = random.Random(arguments.seed)
+    store = GameStore.recover(arguments.directory, arguments.batch_size)
+    game_numbers = [store.new_game() for _ in range(arguments.games)]
+    move_seconds = 0.0
+    moves = 0
+    for round_number in range(arguments.moves):
+        if round_number == arguments.moves // 2:
+            store.checkpoint()
+        for game_number in game_numbers:
+            game = store.get_game(game_number)
+            legal_moves = game.generate_moves(game.get_turn())
+            if not legal_moves:
+                continue
+            starting_pos, ending_pos = rng.choice(legal_moves)
+            start_time = time.perf_counter()
+            store.make_move(game_number, starting_pos, ending_pos)
+            move_seconds += time.perf_counter() - start_time
+            moves += 1
+    store.commit()
+    expected = {game_number: store.get_game(game_number).to_fen() for game_number in store.get_game_numbers()}
+    statistics = store.get_statistics()
+    store.close()
+
+    recovered = GameStore.recover(arguments.directory, arguments.batch_size)
+    matches = all(recovered.get_game(game_number) is not None and recovered.get_game(game_number).to_fen() == fen
+                  for game_number, fen in expected.items())
+    print(json.dumps({"moves": moves, "us_per_move": round(move_seconds / moves * 1e6, 3) if moves else 0,
+                      "commits": statistics["commits"],
+                      "us_per_commit": round(statistics["commit_seconds"] / statistics["commits"] * 1e6, 1)
+                      if statistics["commits"] else 0,
+                      "snapshot_seconds": round(statistics["snapshot_seconds"], 3),
+                      "recovery": recovered.get_statistics()["recovery"], "recovered_matches": matches}))
+    recovered.close()
+
+
+if __name__ == "__main__":
+    main()